@@ -1,5 +1,5 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import NoReturn
 
 import jwt
@@ -84,17 +84,18 @@ async def get_current_user(
     # Try OAuth2 token authentication
     if token:
         try:
-            # Decode JWT token
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+            # Decode the JWT, checking its signature and expiry locally before
+            # any cache or database access; tokens without an exp are rejected
+            payload = jwt.decode(
+                token,
+                JWT_SECRET_KEY,
+                algorithms=[JWT_ALGORITHM],
+                options={"require": ["exp"]},
+            )
             user_id: str = payload.get("sub")
             if user_id is None:
                 raise_credentials_exception()
 
-            # Verify token has not expired
-            exp = payload.get("exp")
-            if exp is None or datetime.fromtimestamp(exp) < datetime.utcnow():
-                raise_credentials_exception()
-
             # Retrieve user from auth service
             if state.services.auth is None:
                 logger.error("Auth service not initialized")
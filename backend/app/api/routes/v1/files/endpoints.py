@@ -1,6 +1,7 @@
 from typing import Annotated, NoReturn
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.api.dependencies.auth import verify_download_permission
 from app.api.dependencies.services import get_file_service, get_project_service
@@ -116,9 +117,10 @@ async def serve_file(
                     status_code=404, detail=f"Signature file not found: {file_path}"
                 ) from e
 
-        # Regular file download
-        content, content_type, headers = await file_service.get_file(file_path)
-        return Response(content=content, media_type=content_type, headers=headers)
+        # Regular file download, streamed from storage so large distributions
+        # are never held in memory whole
+        stream, content_type, headers = await file_service.get_file_stream(file_path)
+        return StreamingResponse(stream, media_type=content_type, headers=headers)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
     except Exception as e:
@@ -5,6 +5,16 @@ from app.api.routes.v1.files.models import FileMetadata
 from app.core.clients.postgres import PostgresClient
 from app.core.clients.s3 import S3Client
 from app.core.clients.valkey import ValkeyClient
+from app.services.project_service import normalize_name
+
+# Storage metadata keys that are not copied into X-* response headers
+_RESERVED_METADATA_KEYS: frozenset[str] = frozenset(
+    {"content_type", "etag", "size", "last_modified"}
+)
+
+# Note: the handlers in this module are not wired to any route; the live
+# /files/ endpoints in endpoints.py go through FileService and ProjectService.
+# Measure changes against endpoints.py, not these functions.
 
 
 async def download_file(
@@ -14,11 +24,6 @@ async def download_file(
     valkey: ValkeyClient | None = None,
 ) -> tuple[bytes, str, dict[str, str]]:
     """Returns (file_content, content_type, headers) from storage"""
-    # Create S3 storage repository
-    from app.repos.s3.storage_repo import S3StorageRepository
-
-    storage_repo = S3StorageRepository(s3)
-
     # Create cache repo if valkey is available
     cache_repo = None
     if valkey:
@@ -26,6 +31,12 @@ async def download_file(
 
         cache_repo = ValkeyCacheRepository(valkey)
 
+    # Create S3 storage repository; the cache lets repeat downloads skip the
+    # existence HEAD request
+    from app.repos.s3.storage_repo import S3StorageRepository
+
+    storage_repo = S3StorageRepository(s3, cache_repo)
+
     # Check if file exists
     if not await storage_repo.file_exists(file_path):
         # Use a standard error message that will be handled by error middleware
@@ -88,7 +99,9 @@ async def download_file(
                         release_repo = PostgresReleaseRepository(postgres)
 
                         # Get project and release IDs
-                        project = await project_repo.get_project_by_name(project_name)
+                        project = await project_repo.get_project_by_name(
+                            normalize_name(project_name)
+                        )
                         if project and project.id:
                             release = await release_repo.get_release(
                                 project.id, version
@@ -164,15 +177,16 @@ async def download_file(
         "Content-Disposition": f'attachment; filename="{filename}"',
         "Content-Type": content_type,
         "Content-Length": str(len(content)),
-        "ETag": metadata.get("etag", f'"{hashlib.sha256(content).hexdigest()[:32]}"'),
-        "Last-Modified": metadata.get("last_modified", datetime.utcnow()).strftime(
+        # Only fall back to hashing the content when storage has no ETag
+        "ETag": metadata.get("etag") or f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        "Last-Modified": (metadata.get("last_modified") or datetime.utcnow()).strftime(
             "%a, %d %b %Y %H:%M:%S GMT"
         ),
     }
 
     # Add any additional metadata as headers
     for key, value in metadata.items():
-        if key not in ["content_type", "etag", "size", "last_modified"]:
+        if key not in _RESERVED_METADATA_KEYS:
             headers[f"X-{key.capitalize()}"] = str(value)
 
     # Cache the file content for frequently accessed files (if size is reasonable)
@@ -234,7 +248,7 @@ async def get_file_metadata(
         s3_metadata = await storage_repo.get_file_metadata(file_path)
 
         # Try to get project from database
-        project = await project_repo.get_project_by_name(project_name)
+        project = await project_repo.get_project_by_name(normalize_name(project_name))
         if project and project.id:
             # Try to get release
             release = await release_repo.get_release(project.id, version)
@@ -390,7 +404,7 @@ async def download_file_metadata(
         release_repo = PostgresReleaseRepository(postgres)
 
         # Get project, release, and file metadata from database
-        project = await project_repo.get_project_by_name(project_name)
+        project = await project_repo.get_project_by_name(normalize_name(project_name))
         if project and project.id:
             release = await release_repo.get_release(project.id, version)
             if release and release.id:
@@ -404,9 +418,12 @@ async def download_file_metadata(
 
                     storage_repo = S3StorageRepository(s3)
 
-                    if await storage_repo.file_exists(metadata_path):
-                        # Get metadata content from S3
-                        metadata_content = await storage_repo.get_file(metadata_path)
+                    # Get metadata content from S3 in one request, rather than
+                    # an existence check followed by the download
+                    metadata_content = await storage_repo.get_file_with_presence(
+                        metadata_path
+                    )
+                    if metadata_content is not None:
                         metadata = await storage_repo.get_file_metadata(metadata_path)
 
                         # Set appropriate headers
@@ -158,7 +158,7 @@ async def legacy_upload(
 
         # Get or create the project
         normalized_name = normalize_name(name)
-        project = await project_service.get_project_by_name(name)
+        project = await project_service.get_project_by_name(normalized_name)
 
         if not project:
             # Create new project
@@ -176,7 +176,7 @@ async def legacy_upload(
             metadata = {}
 
         # Get or create the release
-        releases = await project_service.get_project_releases(name)
+        releases = await project_service.get_project_releases(normalized_name)
         release = next((r for r in releases if r.version == version), None)
 
         if not release:
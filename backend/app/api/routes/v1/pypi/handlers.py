@@ -1,20 +1,18 @@
-import re
 from datetime import datetime
 
 from app.api.routes.v1.pypi.models import ProjectInfo, ProjectJSONResponse, ReleaseFile
-from app.core.clients.postgres import PostgresClient
 from app.core.clients.s3 import S3Client
 from app.core.clients.valkey import ValkeyClient
+from app.services.project_service import ProjectService, normalize_name
 
-
-def normalize_name(name: str) -> str:
-    """Normalize package name to lowercase with hyphens per PEP 503."""
-    return re.sub(r"[-_.]+", "-", name).lower()
+# Note: get_project_json is not wired to any route; the live /pypi/ endpoints
+# in endpoints.py build their responses from ProjectService directly. Measure
+# changes against endpoints.py, not this function.
 
 
 async def get_project_json(
     project_name: str,
-    postgres: PostgresClient,
+    project_service: ProjectService,
     s3: S3Client,
     valkey: ValkeyClient | None = None,
 ) -> ProjectJSONResponse:
@@ -37,23 +35,6 @@ async def get_project_json(
                 logging.getLogger(__name__).warning("Error parsing cached data")
                 # Continue with DB fetch
 
-    # Set up repositories and services
-    from app.repos.postgres.file_repo import PostgresFileRepository
-    from app.repos.postgres.project_repo import PostgresProjectRepository
-    from app.repos.postgres.release_repo import PostgresReleaseRepository
-    from app.services.project_service import ProjectService
-
-    project_repo = PostgresProjectRepository(postgres)
-    release_repo = PostgresReleaseRepository(postgres)
-    file_repo = PostgresFileRepository(postgres)
-
-    project_service = ProjectService(
-        project_repo=project_repo,
-        release_repo=release_repo,
-        file_repo=file_repo,
-        cache_repo=None,
-    )
-
     # Initialize default response to use in case of failure
     empty_response = ProjectJSONResponse(
         info=ProjectInfo(
@@ -74,14 +55,14 @@ async def get_project_json(
 
     try:
         # Get the project
-        project = await project_service.get_project_by_name(project_name)
+        project = await project_service.get_project_by_name(normalized_name)
 
         if not project:
             # Return an empty response for non-existent projects
             return empty_response
 
         # Get all releases for the project
-        releases = await project_service.get_project_releases(project_name)
+        releases = await project_service.get_project_releases(normalized_name)
 
         if not releases:
             # Project exists but has no releases
@@ -133,7 +114,7 @@ async def get_project_json(
         for release in releases:
             # Get files for this release
             release_files = await project_service.get_release_files(
-                project_name, release.version
+                normalized_name, release.version
             )
 
             # Convert to ReleaseFile objects
@@ -191,7 +172,7 @@ async def get_project_json(
         if valkey:
             await cache_repo.set(
                 f"pypi_json:{normalized_name}",
-                response.dict(),
+                response.model_dump(),
                 expire=60 * 10,  # Cache for 10 minutes
             )
     except Exception:
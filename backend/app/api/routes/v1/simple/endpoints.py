@@ -1,8 +1,9 @@
 import logging
+from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from app.api.dependencies.services import get_project_service
 from app.api.routes.v1.simple.handlers import (
@@ -11,10 +12,14 @@ from app.api.routes.v1.simple.handlers import (
     validate_requires_python,
 )
 from app.domain.models import File, Project
-from app.services.project_service import ProjectService
+from app.services.project_service import ProjectService, normalize_name
 
 logger = logging.getLogger(__name__)
 
+# Negotiated media types that are rendered as HTML
+_HTML_CONTENT_TYPES: frozenset[str] = frozenset(
+    {"text/html", "application/vnd.pypi.simple.v1+html"}
+)
 
 router = APIRouter()
 
@@ -73,7 +78,7 @@ async def negotiate_content_type(
     for mime_type, _ in media_types:
         if mime_type == "application/vnd.pypi.simple.v1+json":
             return "application/vnd.pypi.simple.v1+json"
-        elif mime_type in ["application/vnd.pypi.simple.v1+html", "text/html"]:
+        elif mime_type in _HTML_CONTENT_TYPES:
             return "application/vnd.pypi.simple.v1+html"
 
     # If we got here, no acceptable match was found
@@ -81,9 +86,9 @@ async def negotiate_content_type(
     return "text/html"
 
 
-def render_project_list_html(projects: list[Project]) -> str:
-    """Render a project list as HTML."""
-    html = """<!DOCTYPE html>
+async def stream_project_list_html(names: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Render a project list as HTML, one anchor at a time."""
+    yield """<!DOCTYPE html>
 <html>
   <head>
     <meta name="pypi:repository-version" content="1.3">
@@ -91,13 +96,12 @@ def render_project_list_html(projects: list[Project]) -> str:
   <body>
 """
 
-    for project in projects:
-        html += f'    <a href="/simple/{project.normalized_name}/">{project.name}</a>\n'
+    async for name in names:
+        yield f'    <a href="/simple/{normalize_name(name)}/">{name}</a>\n'
 
-    html += """  </body>
+    yield """  </body>
 </html>
 """
-    return html
 
 
 def render_project_detail_html(
@@ -191,24 +195,26 @@ async def simple_index(
 
     # Implements PEPs 503, 691, 658, and 592 for Simple API
     """
-    # Get all projects from the service
-    projects = await project_service.get_all_projects()
-
-    # Return response in the negotiated format
-    if content_type in ["text/html", "application/vnd.pypi.simple.v1+html"]:
-        html_content = render_project_list_html(projects)
-        return HTMLResponse(content=html_content, media_type=content_type)
+    # Return response in the negotiated format. Only project names are read,
+    # streamed from the database rather than loading every project row
+    if content_type in _HTML_CONTENT_TYPES:
+        return StreamingResponse(
+            stream_project_list_html(project_service.iter_project_names()),
+            media_type=content_type,
+        )
     elif content_type == "application/vnd.pypi.simple.v1+json":
         # Build the JSON response according to PEP 691
-        # Get versions for all projects (for tracks metadata per PEP 708)
-        versions = {}
-        for p in projects:
-            project_releases = await project_service.get_project_releases(p.name)
-            versions[p.normalized_name] = [r.version for r in project_releases]
+        # Get versions for all projects (for tracks metadata per PEP 708),
+        # aggregated alongside the names in a single query
+        project_names: list[dict[str, str]] = []
+        versions: dict[str, list[str]] = {}
+        async for name, project_versions in project_service.iter_project_versions():
+            project_names.append({"name": name})
+            versions[normalize_name(name)] = project_versions
 
         json_response = {
             "meta": {"api-version": "1.3"},
-            "projects": [{"name": p.name} for p in projects],
+            "projects": project_names,
             "versions": versions,
             "tracks": {
                 "default": {"stable": True},
@@ -266,7 +272,7 @@ async def project_detail(
     all_files.sort(key=lambda f: f.filename)
 
     # Return response in the negotiated format
-    if content_type in ["text/html", "application/vnd.pypi.simple.v1+html"]:
+    if content_type in _HTML_CONTENT_TYPES:
         html_content = render_project_detail_html(project, all_files, versions)
         return HTMLResponse(content=html_content, media_type=content_type)
     elif content_type == "application/vnd.pypi.simple.v1+json":
@@ -1,5 +1,4 @@
 import logging
-import traceback
 
 from fastapi import FastAPI
 
@@ -65,7 +64,6 @@ class AppState:
             await self.postgres.initialize()
         except Exception:
             logger.exception("Failed to initialize PostgreSQL client")
-            logger.debug(traceback.format_exc())
             # Continue even if PostgreSQL fails, but service will be degraded
             self.postgres = None
 
@@ -75,7 +73,6 @@ class AppState:
             await self.s3.initialize()
         except Exception:
             logger.exception("Failed to initialize S3 client")
-            logger.debug(traceback.format_exc())
             # Continue even if S3 fails, but service will be degraded
             self.s3 = None
 
@@ -85,10 +82,13 @@ class AppState:
             await self.valkey.initialize()
         except Exception:
             logger.exception("Failed to initialize Valkey client")
-            logger.debug(traceback.format_exc())
             # Continue even if Valkey fails, but service will be degraded
             self.valkey = None
 
+        # Let the Postgres client cache results of queries tagged with a TTL
+        if self.postgres and self.valkey:
+            self.postgres.set_result_cache(self.valkey)
+
         # Initialize repositories with error handling
         logger.info("Initializing repositories")
         if self.postgres:
@@ -103,14 +103,6 @@ class AppState:
             self.release_repo = None
             self.file_repo = None
 
-        if self.s3:
-            self.storage_repo = S3StorageRepository(self.s3)
-        else:
-            logger.warning(
-                "S3 storage repository unavailable due to client initialization failure"
-            )
-            self.storage_repo = None
-
         if self.valkey:
             self.cache_repo = ValkeyCacheRepository(self.valkey)
         else:
@@ -119,6 +111,14 @@ class AppState:
             )
             self.cache_repo = None
 
+        if self.s3:
+            self.storage_repo = S3StorageRepository(self.s3, self.cache_repo)
+        else:
+            logger.warning(
+                "S3 storage repository unavailable due to client initialization failure"
+            )
+            self.storage_repo = None
+
         # Initialize services
         logger.info("Initializing services")
 
@@ -173,13 +173,19 @@ class AppState:
         """Clean up all clients."""
         logger.info("Cleaning up application state")
 
+        # Write any batched API key usage while the database is still available
+        if self.services.auth:
+            try:
+                await self.services.auth.close()
+            except Exception:
+                logger.exception("Error during AuthService cleanup")
+
         if self.postgres:
             try:
                 logger.info("Cleaning up PostgreSQL client")
                 await self.postgres.cleanup()
             except Exception:
                 logger.exception("Error during PostgreSQL cleanup")
-                logger.debug(traceback.format_exc())
 
         if self.s3:
             try:
@@ -187,7 +193,6 @@ class AppState:
                 await self.s3.cleanup()
             except Exception:
                 logger.exception("Error during S3 cleanup")
-                logger.debug(traceback.format_exc())
 
         if self.valkey:
             try:
@@ -195,7 +200,6 @@ class AppState:
                 await self.valkey.cleanup()
             except Exception:
                 logger.exception("Error during Valkey cleanup")
-                logger.debug(traceback.format_exc())
 
         logger.info("Application state cleanup complete")
 
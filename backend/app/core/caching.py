@@ -0,0 +1,11 @@
+import random
+
+# Fraction by which cache lifetimes are randomly lengthened or shortened, so
+# entries written together don't all expire, and get refilled, at once
+CACHE_TTL_JITTER = 0.2
+
+
+def jittered_ttl(base: int) -> int:
+    """Spread a cache lifetime of base seconds by up to CACHE_TTL_JITTER either way."""
+    spread = int(base * CACHE_TTL_JITTER)
+    return base + random.randint(-spread, spread)  # noqa: S311 - not for security
@@ -1,10 +1,14 @@
+import hashlib
 import logging
-import traceback
-from typing import Any
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import Any, cast
 
 import asyncpg
+import orjson
 
 from app.core.clients.base import BaseClient
+from app.core.clients.valkey import ValkeyClient
 from app.core.config import PostgresSettings
 
 logger = logging.getLogger(__name__)
@@ -12,6 +16,34 @@ logger = logging.getLogger(__name__)
 # Error messages
 POSTGRES_NOT_INITIALIZED = "PostgreSQL pool is not initialized"
 
+# Rows fetched per round trip when streaming through a server-side cursor
+CURSOR_PREFETCH = 1000
+
+# Key prefix for cached query results; shares the cache repository's namespace
+QUERY_CACHE_PREFIX = "sol:query:"
+
+# Version byte that prefixes the JSON text in jsonb's binary wire format
+JSONB_BINARY_VERSION = b"\x01"
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    """
+    Encode a jsonb parameter in the binary wire format.
+
+    Already-serialized JSON (str or bytes) is sent as-is, so JSON received
+    from a client can be stored without decoding and re-encoding it.
+    """
+    if isinstance(value, str):
+        return JSONB_BINARY_VERSION + value.encode()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return JSONB_BINARY_VERSION + bytes(value)
+    return JSONB_BINARY_VERSION + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    """Decode a jsonb value from the binary wire format."""
+    return orjson.loads(memoryview(data)[1:])
+
 
 class PostgresClient(BaseClient[PostgresSettings]):
     """Client for interacting with PostgreSQL database."""
@@ -20,6 +52,10 @@ class PostgresClient(BaseClient[PostgresSettings]):
         super().__init__(config)
         self._pool: asyncpg.Pool | None = None
         self._initialized: bool = False
+        # Server version and connection identity, fetched by the first health check
+        self._static_diag: dict[str, Any] | None = None
+        # Optional Valkey store for results of queries run with a cache_ttl
+        self._result_cache: ValkeyClient | None = None
 
     async def initialize(self) -> None:
         """Initialize the connection pool to PostgreSQL."""
@@ -40,52 +76,84 @@ class PostgresClient(BaseClient[PostgresSettings]):
                 "database": self.config.database,
                 "min_size": self.config.min_connections,
                 "max_size": self.config.max_connections,
+                "max_inactive_connection_lifetime": self.config.max_inactive_connection_lifetime,
+                # asyncpg keeps a per-connection LRU of prepared statements keyed
+                # by query text, so repeat queries skip the parse/plan round-trip.
+                # The repositories' static queries are all served from it; SQL
+                # whose text varies per call should use conn.prepare() instead
+                "statement_cache_size": self.config.prepared_cache_size,
+                "init": self._init_connection,
             }
 
-            # Only add command_timeout if specified
+            # Only add the timeouts if specified
             if self.config.statement_timeout is not None:
                 connect_kwargs["command_timeout"] = self.config.statement_timeout
+                # Sent as a startup parameter so every pooled connection gets it
+                # when opened, and it survives the RESET ALL asyncpg runs when a
+                # connection is released back to the pool
+                timeout_ms = self.config.statement_timeout * 1000
+                connect_kwargs["server_settings"] = {
+                    "statement_timeout": str(timeout_ms)
+                }
 
             logger.debug(f"PostgreSQL connection parameters: {connect_kwargs}")
 
             # Create the connection pool
             self._pool = await asyncpg.create_pool(**connect_kwargs)
 
-            # If statement_timeout is specified, set it for all connections in the pool
-            if self.config.statement_timeout is not None:
-                timeout_ms = (
-                    self.config.statement_timeout * 1000
-                )  # Convert to milliseconds
-                async with self._pool.acquire() as conn:
-                    await conn.execute(f"SET statement_timeout = {timeout_ms}")
-
             self._initialized = True
             logger.info("PostgreSQL client initialization successful")
         except Exception:
             logger.exception(
                 f"Failed to initialize PostgreSQL client with host={self.config.host}, port={self.config.port}, db={self.config.database}"
             )
-            logger.debug(traceback.format_exc())
             raise
 
+    @staticmethod
+    async def _init_connection(conn: asyncpg.Connection) -> None:
+        """Configure each new pool connection once, when it is opened."""
+        # Decode jsonb with orjson instead of handing back raw JSON text, using
+        # the binary format so values skip the str round trip in both directions
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary",
+        )
+
     async def cleanup(self) -> None:
         """Close all connections in the pool."""
         if self._pool is not None:
             await self._pool.close()
             self._pool = None
             self._initialized = False
+            self._static_diag = None
 
     async def get_metrics(self) -> dict[str, Any]:
         """Get connection pool metrics."""
         if not self._pool:
             return {"status": "not_initialized"}
 
+        size = self._pool.get_size()
+        free_size = self._pool.get_idle_size()
+
+        # Every connection is checked out and the pool cannot grow any further,
+        # so new requests will queue on acquire()
+        exhausted = size >= self.config.max_connections and free_size == 0
+        if exhausted:
+            logger.warning(
+                f"PostgreSQL connection pool exhausted ({size}/{self.config.max_connections} in use); "
+                "consider raising POSTGRES_MAX_CONNECTIONS"
+            )
+
         return {
             "status": "initialized",
             "min_size": self.config.min_connections,
             "max_size": self.config.max_connections,
-            "size": self._pool.get_size(),
-            "free_size": self._pool.get_idle_size(),
+            "size": size,
+            "free_size": free_size,
+            "exhausted": exhausted,
         }
 
     async def health_check(self) -> bool:
@@ -102,69 +170,204 @@ class PostgresClient(BaseClient[PostgresSettings]):
                 result = await conn.fetchval("SELECT 1")
                 logger.info(f"PostgreSQL health check result: {result}")
 
-                # Get PostgreSQL version for diagnostics
-                version = await conn.fetchval("SELECT version()")
-                logger.info(f"PostgreSQL version: {version}")
-
-                # Get connection info
-                conn_info = await conn.fetchrow(
-                    "SELECT current_database(), current_user"
-                )
-                logger.info(
-                    f"Connected as: {conn_info['current_user']} to database: {conn_info['current_database']}"
-                )
+                # Version and connection identity don't change for the life of
+                # the pool, so only look them up on the first check
+                if self._static_diag is None:
+                    version = await conn.fetchval("SELECT version()")
+                    conn_info = await conn.fetchrow(
+                        "SELECT current_database(), current_user"
+                    )
+                    self._static_diag = {
+                        "version": version,
+                        "database": conn_info["current_database"],
+                        "user": conn_info["current_user"],
+                    }
+                    logger.info(f"PostgreSQL version: {version}")
+                    logger.info(
+                        f"Connected as: {conn_info['current_user']} to database: {conn_info['current_database']}"
+                    )
 
                 return result == 1
         except Exception:
             logger.exception("PostgreSQL health check failed")
-            logger.debug(traceback.format_exc())
             return False
 
-    async def execute(self, query: str, *args: Any) -> str:
-        """Execute a SQL query and return the command tag."""
-        if not self._initialized:
-            await self.initialize()
+    async def _ensure_pool(self) -> asyncpg.Pool:
+        """Initialize the pool on first use; slow path for the query helpers."""
+        await self.initialize()
         if self._pool is None:
             raise ValueError(POSTGRES_NOT_INITIALIZED)
-        return await self._pool.execute(query, *args)
+        return self._pool
 
-    async def fetch(self, query: str, *args: Any) -> list[asyncpg.Record]:
-        """Execute a query and return all rows."""
-        if not self._initialized:
-            await self.initialize()
-        if self._pool is None:
-            raise ValueError(POSTGRES_NOT_INITIALIZED)
-        return await self._pool.fetch(query, *args)
+    async def execute(self, query: str, *args: Any) -> str:
+        """Execute a SQL query and return the command tag."""
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        return await pool.execute(query, *args)
 
-    async def fetchval(self, query: str, *args: Any) -> Any:
-        """Execute a query and return a single value."""
-        if not self._initialized:
-            await self.initialize()
-        if self._pool is None:
-            raise ValueError(POSTGRES_NOT_INITIALIZED)
-        return await self._pool.fetchval(query, *args)
+    async def fetch(
+        self, query: str, *args: Any, cache_ttl: int | None = None
+    ) -> list[asyncpg.Record]:
+        """
+        Execute a query and return all rows.
+
+        Pass `cache_ttl` (seconds) to serve the result from the result cache
+        when one is attached. Cached rows come back as dicts, which support
+        the same key access as records.
+        """
+        if cache_ttl is not None and self._result_cache is not None:
+            rows = await self._fetch_cached("fetch", query, args, cache_ttl)
+            return cast(list[asyncpg.Record], rows)
+
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        return await pool.fetch(query, *args)
+
+    async def fetchval(
+        self, query: str, *args: Any, cache_ttl: int | None = None
+    ) -> Any:
+        """
+        Execute a query and return a single value.
+
+        Pass `cache_ttl` (seconds) to serve the result from the result cache
+        when one is attached.
+        """
+        if cache_ttl is not None and self._result_cache is not None:
+            return await self._fetch_cached("fetchval", query, args, cache_ttl)
+
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        return await pool.fetchval(query, *args)
 
     async def fetchrow(self, query: str, *args: Any) -> asyncpg.Record | None:
         """Execute a query and return a single row."""
-        if not self._initialized:
-            await self.initialize()
-        if self._pool is None:
-            raise ValueError(POSTGRES_NOT_INITIALIZED)
-        return await self._pool.fetchrow(query, *args)
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        return await pool.fetchrow(query, *args)
+
+    async def cursor(
+        self, query: str, *args: Any, prefetch: int = CURSOR_PREFETCH
+    ) -> AsyncIterator[asyncpg.Record]:
+        """
+        Stream rows from a query through a server-side cursor.
+
+        Rows are fetched from the server in batches of `prefetch` records, so
+        large result sets are never fully buffered in memory. Prefer this over
+        fetch() for queries that may return many rows:
+
+            async for record in postgres.cursor(query, *args):
+                ...
+        """
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        async with pool.acquire() as conn, conn.transaction():
+            async for record in conn.cursor(query, *args, prefetch=prefetch):
+                yield record
+
+    def set_result_cache(self, valkey: ValkeyClient | None) -> None:
+        """
+        Attach a Valkey client used to cache results of queries run with a cache_ttl.
+
+        Only tag queries whose results tolerate staleness up to the TTL and whose
+        values are JSON-serializable; anything else (e.g. timestamps) is cached
+        as its string form.
+        """
+        self._result_cache = valkey
+
+    async def _fetch_cached(
+        self, method: str, query: str, args: tuple[Any, ...], ttl: int
+    ) -> Any:
+        """Run fetch/fetchval through the Valkey result cache."""
+        valkey = cast(ValkeyClient, self._result_cache)
+        digest = hashlib.sha256(
+            orjson.dumps([method, query, args], default=str)
+        ).hexdigest()
+        key = f"{QUERY_CACHE_PREFIX}{digest}"
+
+        try:
+            cached = await valkey.get(key)
+            if cached is not None:
+                # Valkey returns bytes, which orjson parses without a decode
+                return orjson.loads(cached)
+        except Exception as e:
+            # The cache is an optimization; fall through to the database
+            logger.warning(f"Failed to read query result cache: {e}")
+
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        if method == "fetch":
+            result: Any = [dict(row) for row in await pool.fetch(query, *args)]
+        else:
+            result = await pool.fetchval(query, *args)
+
+        try:
+            await valkey.set(key, orjson.dumps(result, default=str), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Failed to write query result cache: {e}")
+
+        return result
 
     async def execute_many(self, query: str, args_list: list[tuple[Any, ...]]) -> None:
         """Execute a query with different sets of arguments."""
-        if not self._initialized:
-            await self.initialize()
-        if self._pool is None:
-            raise ValueError(POSTGRES_NOT_INITIALIZED)
-        async with self._pool.acquire() as conn:
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
             await conn.executemany(query, args_list)
 
+    async def copy_records(
+        self,
+        table: str,
+        records: Iterable[tuple[Any, ...]],
+        columns: list[str] | None = None,
+    ) -> str:
+        """
+        Bulk insert rows into a table using the COPY protocol.
+
+        Much faster than execute_many for large single-table inserts since rows
+        are streamed in binary form without a per-row Bind/Execute round.
+
+        Args:
+            table: Name of the target table
+            records: Row tuples, in the order given by `columns`
+            columns: Target columns; all table columns if omitted
+
+        Returns:
+            The COPY command tag
+        """
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            return await conn.copy_records_to_table(
+                table, records=records, columns=columns
+            )
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[asyncpg.Connection]:
+        """
+        Pin a single pooled connection for a batch of back-to-back queries.
+
+        The yielded connection exposes the same execute/fetch/fetchval/fetchrow
+        methods as this client, but skips the pool acquire/release around every
+        statement. asyncpg does not allow concurrent queries on one connection,
+        so statements must still be awaited one after another.
+        """
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            yield conn
+
     async def transaction(self) -> Any:
         """Start a transaction and return a transaction context manager."""
-        if not self._initialized:
-            await self.initialize()
-        if self._pool is None:
-            raise ValueError(POSTGRES_NOT_INITIALIZED)
-        return self._pool.acquire()
+        pool = self._pool
+        if pool is None:
+            pool = await self._ensure_pool()
+        return pool.acquire()
@@ -1,6 +1,8 @@
+import asyncio
 import io
 import logging
-import traceback
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 from typing import Any
 
 import aiobotocore.session
@@ -11,6 +13,15 @@ from app.core.config import S3Settings
 
 logger = logging.getLogger(__name__)
 
+# Error messages
+S3_NOT_INITIALIZED = "S3 client is not initialized"
+
+# Read size used when streaming object bodies
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of keys S3 accepts in one DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+
 
 class MissingBucketError(ValueError):
     """Raised when bucket name is not provided and no default bucket is set."""
@@ -19,13 +30,21 @@ class MissingBucketError(ValueError):
         super().__init__("Bucket name must be provided or set as default_bucket")
 
 
+class BufferTooSmallError(ValueError):
+    """Raised when a download buffer cannot hold the whole object."""
+
+    def __init__(self, size: int, capacity: int) -> None:
+        super().__init__(f"Object is {size} bytes but the buffer holds {capacity}")
+
+
 class S3Client(BaseClient[S3Settings]):
     """Client for interacting with S3-compatible object storage."""
 
     def __init__(self, config: S3Settings) -> None:
         super().__init__(config)
         self._session = aiobotocore.session.AioSession()
-        self._client = None
+        self._client: Any = None
+        self._exit_stack: AsyncExitStack | None = None
         self._initialized: bool = False
 
     async def initialize(self) -> None:
@@ -35,19 +54,21 @@ class S3Client(BaseClient[S3Settings]):
 
         logger.info(f"Initializing S3 client with endpoint {self.config.endpoint_url}")
         try:
-            # Just validate the config, don't create the client yet
-            # We'll create a new client for each operation
+            # Keep one client (and its connection pool) open for the lifetime
+            # of this object instead of creating one per operation
+            exit_stack = AsyncExitStack()
+            self._client = await exit_stack.enter_async_context(self._get_client())
+            self._exit_stack = exit_stack
             self._initialized = True
             logger.info("S3 client initialization successful")
         except Exception:
             logger.exception(
                 f"Failed to initialize S3 client with endpoint={self.config.endpoint_url}, region={self.config.region_name}"
             )
-            logger.debug(traceback.format_exc())
             raise
 
     def _get_client(self) -> Any:
-        """Get a new S3 client instance."""
+        """Create a new S3 client context manager."""
         return self._session.create_client(
             "s3",
             region_name=self.config.region_name,
@@ -60,7 +81,10 @@ class S3Client(BaseClient[S3Settings]):
 
     async def cleanup(self) -> None:
         """Close the S3 client."""
-        # Nothing to clean up when using the context manager approach
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+        self._client = None
         self._initialized = False
 
     async def get_metrics(self) -> dict[str, Any]:
@@ -79,26 +103,28 @@ class S3Client(BaseClient[S3Settings]):
 
         try:
             logger.info("Performing S3 health check")
-            async with self._get_client() as client:
-                result = await client.list_buckets()
-                buckets = [b["Name"] for b in result.get("Buckets", [])]
-                logger.info(f"S3 health check successful. Buckets: {buckets}")
-
-                # Also check if the default bucket exists
-                if (
-                    self.config.default_bucket
-                    and self.config.default_bucket not in buckets
-                ):
-                    logger.warning(
-                        f"Default bucket '{self.config.default_bucket}' not found in available buckets"
-                    )
+            result = await self._client.list_buckets()
+            buckets = [b["Name"] for b in result.get("Buckets", [])]
+            logger.info(f"S3 health check successful. Buckets: {buckets}")
+
+            # Also check if the default bucket exists
+            if self.config.default_bucket and self.config.default_bucket not in buckets:
+                logger.warning(
+                    f"Default bucket '{self.config.default_bucket}' not found in available buckets"
+                )
         except Exception:
             logger.exception("S3 health check failed")
-            logger.debug(traceback.format_exc())
             return False
         else:
             return True
 
+    async def _ensure_client(self) -> Any:
+        """Initialize the client on first use; slow path for the operations."""
+        await self.initialize()
+        if self._client is None:
+            raise ValueError(S3_NOT_INITIALIZED)
+        return self._client
+
     async def upload_file(
         self,
         bucket: str | None,
@@ -121,8 +147,9 @@ class S3Client(BaseClient[S3Settings]):
             Response metadata from S3
 
         """
-        if not self._initialized:
-            await self.initialize()
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
         bucket_name = bucket or self.config.default_bucket
         if not bucket_name:
@@ -138,19 +165,93 @@ class S3Client(BaseClient[S3Settings]):
             body = data
 
         # Prepare upload parameters
-        params: dict[str, Any] = {"Bucket": bucket_name, "Key": key, "Body": body}
+        params: dict[str, Any] = {"Bucket": bucket_name, "Key": key}
 
         if content_type:
             params["ContentType"] = content_type
 
         if metadata:
-            # Ensure metadata is a dict of strings as required by S3
-            str_metadata: dict[str, str] = {str(k): str(v) for k, v in metadata.items()}
-            params["Metadata"] = str_metadata
+            # S3 requires string metadata; only rebuild the dict if a caller
+            # passed something else
+            if all(
+                isinstance(k, str) and isinstance(v, str) for k, v in metadata.items()
+            ):
+                params["Metadata"] = metadata
+            else:
+                params["Metadata"] = {str(k): str(v) for k, v in metadata.items()}
+
+        # Large bodies are split into parts and uploaded concurrently
+        size = self._body_size(body)
+        if size is not None and size >= self.config.multipart_threshold:
+            return await self._upload_multipart(client, params, body, size)
+
+        return await client.put_object(Body=body, **params)
+
+    @staticmethod
+    def _body_size(body: bytes | io.IOBase) -> int | None:
+        """Return the number of bytes left in the body, or None if unknown."""
+        if isinstance(body, bytes):
+            return len(body)
+        if not body.seekable():
+            return None
+        position = body.tell()
+        end = body.seek(0, io.SEEK_END)
+        body.seek(position)
+        return end - position
+
+    async def _upload_multipart(
+        self,
+        client: Any,
+        params: dict[str, Any],
+        body: bytes | io.IOBase,
+        size: int,
+    ) -> dict[str, Any]:
+        """
+        Upload a body as a multipart upload with parts sent in parallel.
 
-        async with self._get_client() as client:
-            response = await client.put_object(**params)
-            return response
+        At most `multipart_concurrency` parts are read into memory and in
+        flight at once. The upload is aborted if any part fails.
+        """
+        part_size = self.config.multipart_chunksize
+        semaphore = asyncio.Semaphore(self.config.multipart_concurrency)
+
+        upload = await client.create_multipart_upload(**params)
+        upload_id = upload["UploadId"]
+        part_params = {"Bucket": params["Bucket"], "Key": params["Key"]}
+
+        async def upload_part(part_number: int, chunk: bytes) -> dict[str, Any]:
+            try:
+                response = await client.upload_part(
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                    **part_params,
+                )
+            finally:
+                semaphore.release()
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        tasks: list[asyncio.Task[dict[str, Any]]] = []
+        try:
+            for part_number, offset in enumerate(range(0, size, part_size), start=1):
+                await semaphore.acquire()
+                if isinstance(body, bytes):
+                    chunk = body[offset : offset + part_size]
+                else:
+                    chunk = body.read(part_size)
+                tasks.append(asyncio.create_task(upload_part(part_number, chunk)))
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await client.abort_multipart_upload(UploadId=upload_id, **part_params)
+            raise
+
+        return await client.complete_multipart_upload(
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+            **part_params,
+        )
 
     async def download_file(self, bucket: str | None, key: str) -> bytes:
         """
@@ -164,18 +265,174 @@ class S3Client(BaseClient[S3Settings]):
             The file contents as bytes
 
         """
-        if not self._initialized:
-            await self.initialize()
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
         bucket_name = bucket or self.config.default_bucket
         if not bucket_name:
             raise MissingBucketError()
 
-        async with self._get_client() as client:
+        # Ask for the first part only; its Content-Range carries the object
+        # size, so small objects still take a single request and larger ones
+        # continue as parallel byte ranges without a separate HEAD
+        part_size = self.config.download_part_size
+        try:
+            response = await client.get_object(
+                Bucket=bucket_name, Key=key, Range=f"bytes=0-{part_size - 1}"
+            )
+        except ClientError as e:
+            # An empty object has no satisfiable byte range
+            if e.response["Error"]["Code"] != "InvalidRange":
+                raise
             response = await client.get_object(Bucket=bucket_name, Key=key)
-            async with response["Body"] as stream:
+
+        async with response["Body"] as stream:
+            size = self._object_size(response)
+            if size is None:
                 return await stream.read()
 
+            # Fill a buffer of the advertised size in place rather than
+            # growing a bytes object chunk by chunk
+            buffer = bytearray(size)
+            view = memoryview(buffer)
+            received = await self._read_into(stream, view)
+
+        if received < size:
+            await self._download_ranges(
+                client, bucket_name, key, response.get("ETag"), view, received
+            )
+        return bytes(buffer)
+
+    @staticmethod
+    def _object_size(response: dict[str, Any]) -> int | None:
+        """Return the full object size from a (possibly ranged) GET response."""
+        content_range = response.get("ContentRange")
+        if content_range:
+            # Formatted as "bytes <first>-<last>/<size>"
+            return int(content_range.rsplit("/", 1)[1])
+        return response.get("ContentLength")
+
+    async def _download_ranges(
+        self,
+        client: Any,
+        bucket: str,
+        key: str,
+        etag: str | None,
+        view: memoryview,
+        start: int,
+    ) -> None:
+        """
+        Fill the rest of a download buffer with byte-range GETs sent in parallel.
+
+        At most `download_concurrency` ranges are in flight at once, and each
+        is read straight into its slice of the buffer. Ranges are pinned to
+        the ETag of the first response so a concurrent overwrite fails the
+        download instead of mixing two versions of the object.
+        """
+        part_size = self.config.download_part_size
+        semaphore = asyncio.Semaphore(self.config.download_concurrency)
+        size = len(view)
+        params: dict[str, Any] = {"Bucket": bucket, "Key": key}
+        if etag:
+            params["IfMatch"] = etag
+
+        async def download_range(offset: int) -> None:
+            end = min(offset + part_size, size)
+            async with semaphore:
+                response = await client.get_object(
+                    Range=f"bytes={offset}-{end - 1}", **params
+                )
+                async with response["Body"] as stream:
+                    await self._read_into(stream, view[offset:end])
+
+        tasks = [
+            asyncio.create_task(download_range(offset))
+            for offset in range(start, size, part_size)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def download_file_into(
+        self, bucket: str | None, key: str, buffer: bytearray | memoryview
+    ) -> int:
+        """
+        Download a file from S3 into a caller-provided buffer without copies.
+
+        Args:
+            bucket: The bucket name (uses default_bucket if None)
+            key: The object key
+            buffer: Writable buffer at least as large as the object
+
+        Returns:
+            The number of bytes written to the start of the buffer
+
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        bucket_name = bucket or self.config.default_bucket
+        if not bucket_name:
+            raise MissingBucketError()
+
+        response = await client.get_object(Bucket=bucket_name, Key=key)
+        async with response["Body"] as stream:
+            size = response["ContentLength"]
+            if size > len(buffer):
+                raise BufferTooSmallError(size, len(buffer))
+            return await self._read_into(stream, memoryview(buffer))
+
+    async def stream_file(
+        self, bucket: str | None, key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Open an S3 object and return an iterator over its body in chunks.
+
+        The GET is sent before this returns, so a missing key raises here
+        rather than partway through a response that has already started.
+
+        Args:
+            bucket: The bucket name (uses default_bucket if None)
+            key: The object key
+            chunk_size: Maximum size of each yielded chunk
+
+        Returns:
+            An async iterator over the object's bytes
+
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        bucket_name = bucket or self.config.default_bucket
+        if not bucket_name:
+            raise MissingBucketError()
+
+        response = await client.get_object(Bucket=bucket_name, Key=key)
+        return self._iter_body(response["Body"], chunk_size)
+
+    @staticmethod
+    async def _iter_body(body: Any, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield a response body in chunks, releasing the connection at the end."""
+        async with body as stream:
+            async for chunk in stream.iter_chunks(chunk_size):
+                yield chunk
+
+    @staticmethod
+    async def _read_into(stream: Any, view: memoryview) -> int:
+        """Copy a response body stream into a memoryview; return bytes read."""
+        offset = 0
+        async for chunk in stream.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+            end = offset + len(chunk)
+            view[offset:end] = chunk
+            offset = end
+        return offset
+
     async def list_objects(
         self, bucket: str | None, prefix: str = "", max_keys: int = 1000
     ) -> list[dict[str, Any]]:
@@ -191,21 +448,23 @@ class S3Client(BaseClient[S3Settings]):
             List of object information
 
         """
-        if not self._initialized:
-            await self.initialize()
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
         bucket_name = bucket or self.config.default_bucket
         if not bucket_name:
             raise MissingBucketError()
 
-        objects = []
-        async with self._get_client() as client:
-            paginator = client.get_paginator("list_objects_v2")
-            async for page in paginator.paginate(
-                Bucket=bucket_name, Prefix=prefix, MaxKeys=max_keys
-            ):
-                if "Contents" in page:
-                    objects.extend(page["Contents"])
+        # Each page request needs the previous page's continuation token, so
+        # pages are inherently fetched one after another
+        objects: list[dict[str, Any]] = []
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(
+            Bucket=bucket_name, Prefix=prefix, MaxKeys=max_keys
+        ):
+            if "Contents" in page:
+                objects.extend(page["Contents"])
 
         return objects
 
@@ -221,16 +480,48 @@ class S3Client(BaseClient[S3Settings]):
             Response metadata from S3
 
         """
-        if not self._initialized:
-            await self.initialize()
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        bucket_name = bucket or self.config.default_bucket
+        if not bucket_name:
+            raise MissingBucketError()
+
+        return await client.delete_object(Bucket=bucket_name, Key=key)
+
+    async def delete_objects(
+        self, bucket: str | None, keys: list[str]
+    ) -> list[dict[str, Any]]:
+        """
+        Delete many objects from S3 using the bulk DeleteObjects API.
+
+        Args:
+            bucket: The bucket name (uses default_bucket if None)
+            keys: The object keys, sent in batches of up to 1000
+
+        Returns:
+            Errors reported by S3 for keys that could not be deleted
+
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
         bucket_name = bucket or self.config.default_bucket
         if not bucket_name:
             raise MissingBucketError()
 
-        async with self._get_client() as client:
-            response = await client.delete_object(Bucket=bucket_name, Key=key)
-            return response
+        errors: list[dict[str, Any]] = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start : start + DELETE_BATCH_SIZE]
+            response = await client.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True},
+            )
+            errors.extend(response.get("Errors", []))
+
+        return errors
 
     async def object_exists(self, bucket: str | None, key: str) -> bool:
         """
@@ -244,18 +535,42 @@ class S3Client(BaseClient[S3Settings]):
             True if the object exists, False otherwise
 
         """
-        if not self._initialized:
-            await self.initialize()
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
         bucket_name = bucket or self.config.default_bucket
         if not bucket_name:
             raise MissingBucketError()
 
         try:
-            async with self._get_client() as client:
-                await client.head_object(Bucket=bucket_name, Key=key)
-                return True
+            await client.head_object(Bucket=bucket_name, Key=key)
         except ClientError as e:
-            if e.response["Error"]["Code"] == "404":
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status == 404:
                 return False
             raise
+        else:
+            return True
+
+    async def head_object(self, bucket: str | None, key: str) -> dict[str, Any]:
+        """
+        Get an object's metadata without downloading it.
+
+        Args:
+            bucket: The bucket name (uses default_bucket if None)
+            key: The object key
+
+        Returns:
+            Response metadata from S3
+
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        bucket_name = bucket or self.config.default_bucket
+        if not bucket_name:
+            raise MissingBucketError()
+
+        return await client.head_object(Bucket=bucket_name, Key=key)
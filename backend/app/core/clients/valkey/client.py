@@ -1,8 +1,11 @@
 import logging
-import traceback
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
 from typing import Any, TypeVar, cast
 
+import orjson
 import valkey.asyncio as valkey
+from valkey.asyncio.client import Pipeline
 
 from app.core.clients.base import BaseClient
 from app.core.config import ValkeySettings
@@ -43,6 +46,9 @@ class ValkeyClient(BaseClient[ValkeySettings]):
                 socket_connect_timeout=self.config.socket_connect_timeout,
                 health_check_interval=self.config.health_check_interval,
                 max_connections=self.config.max_connections,
+                # Values are written and read back as raw bytes; str values are
+                # encoded once by the client, bytes go to the socket untouched
+                decode_responses=False,
             )
             self._initialized = True
             logger.info("Valkey client initialization successful")
@@ -50,7 +56,6 @@ class ValkeyClient(BaseClient[ValkeySettings]):
             logger.exception(
                 f"Failed to initialize Valkey client with host={self.config.host}, port={self.config.port}, db={self.config.db}"
             )
-            logger.debug(traceback.format_exc())
             raise
 
     async def cleanup(self) -> None:
@@ -98,25 +103,26 @@ class ValkeyClient(BaseClient[ValkeySettings]):
             )
         except Exception:
             logger.exception("Valkey health check failed")
-            logger.debug(traceback.format_exc())
             return False
         else:
             return result
 
+    async def _ensure_client(self) -> valkey.Redis:
+        """Initialize the client on first use; slow path for the commands."""
+        await self.initialize()
+        if self._client is None:
+            raise ValueError(VALKEY_NOT_INITIALIZED)
+        return self._client
+
     # Basic operations
 
-    async def get(self, key: str) -> str | None:
+    async def get(self, key: str) -> bytes | None:
         """Get the value of a key."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        # Explicitly calling and handling the result
-        result: Any = self._client.get(key)
-        if hasattr(result, "__await__"):
-            return await result
-        return result  # Fallback case, although this shouldn't happen
+        return await client.get(key)
 
     async def set(
         self,
@@ -142,15 +148,27 @@ class ValkeyClient(BaseClient[ValkeySettings]):
             True if successful, False otherwise
 
         """
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        return bool(await client.set(key, value, ex=ex, px=px, nx=nx, xx=xx))
+
+    async def set_bytes(
+        self, key: str, value: bytes | memoryview, ex: int | None = None
+    ) -> bool:
+        """
+        Set a key to a binary value.
+
+        A memoryview is written to the socket directly, so a slice of a larger
+        buffer (e.g. one filled by S3Client.download_file_into) is cached
+        without first copying it into a bytes object.
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.set(key, value, ex=ex, px=px, nx=nx, xx=xx)
-        if hasattr(result, "__await__"):
-            result = await result
-        return result == "OK"
+        return bool(await client.set(key, value, ex=ex))
 
     async def delete(self, *keys: str) -> int:
         """
@@ -159,15 +177,27 @@ class ValkeyClient(BaseClient[ValkeySettings]):
         Returns:
             Number of keys deleted
         """
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        return await client.delete(*keys)
+
+    async def unlink(self, *keys: str) -> int:
+        """
+        Delete one or more keys, reclaiming their memory in the background.
+
+        Unlike DEL, the server frees large values off its main thread, so
+        deleting many keys doesn't stall other clients.
+
+        Returns:
+            Number of keys unlinked
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.delete(*keys)
-        if hasattr(result, "__await__"):
-            return await result
-        return result
+        return await client.unlink(*keys)
 
     async def exists(self, *keys: str) -> int:
         """
@@ -176,15 +206,11 @@ class ValkeyClient(BaseClient[ValkeySettings]):
         Returns:
             Number of keys that exist
         """
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.exists(*keys)
-        if hasattr(result, "__await__"):
-            return await result
-        return result
+        return await client.exists(*keys)
 
     async def expire(self, key: str, seconds: int) -> bool:
         """
@@ -193,154 +219,171 @@ class ValkeyClient(BaseClient[ValkeySettings]):
         Returns:
             True if successful, False otherwise
         """
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        return await client.expire(key, seconds)
+
+    # JSON values
+
+    async def get_json(self, key: str) -> Any | None:
+        """Get a key and deserialize its JSON value with orjson."""
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        data = await client.get(key)
+        return orjson.loads(data) if data is not None else None
 
-        result: Any = self._client.expire(key, seconds)
-        if hasattr(result, "__await__"):
-            return await result
-        return result
+    async def set_json(self, key: str, value: Any, ex: int | None = None) -> bool:
+        """
+        Serialize a value to JSON with orjson and store it under a key.
+
+        The serialized bytes go to the socket as-is, without an intermediate str.
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        return bool(await client.set(key, orjson.dumps(value), ex=ex))
 
     # Hash operations
 
-    async def hget(self, name: str, key: str) -> str | None:
+    async def hget(self, name: str, key: str) -> bytes | None:
         """Get the value of a hash field."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.hget(name, key)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(str | None, result)
+        return await cast("Awaitable[bytes | None]", client.hget(name, key))
 
     async def hset(self, name: str, key: str, value: str | bytes) -> int:
         """Set the value of a hash field."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        # Convert bytes to str if necessary for valkey - Redis/valkey
-        # expects string values, not bytes
-        value_str: str = value.decode("utf-8") if isinstance(value, bytes) else value
+        return await cast("Awaitable[int]", client.hset(name, key, value))  # type: ignore[arg-type]
 
-        result: Any = self._client.hset(name, key, value_str)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(int, result)
-
-    async def hmget(self, name: str, keys: list[str]) -> list[str | None]:
+    async def hmget(self, name: str, keys: list[str]) -> list[bytes | None]:
         """Get the values of multiple hash fields."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.hmget(name, keys)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(list[str | None], result)
+        return await cast("Awaitable[list[bytes | None]]", client.hmget(name, keys))
 
     async def hmset(self, name: str, mapping: dict[str, str | bytes]) -> bool:
         """Set multiple hash fields."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        # Convert any bytes values to strings
-        str_mapping: dict[str, str] = {}
-        for k, v in mapping.items():
-            if isinstance(v, bytes):
-                str_mapping[k] = v.decode("utf-8")
-            else:
-                str_mapping[k] = v
+        return bool(await client.hmset(name, mapping))  # type: ignore[misc]
 
-        result: Any = self._client.hmset(name, str_mapping)
-        if hasattr(result, "__await__"):
-            result = await result
-        return result == "OK"
-
-    async def hgetall(self, name: str) -> dict[str, str]:
+    async def hgetall(self, name: str) -> dict[bytes, bytes]:
         """Get all fields and values in a hash."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.hgetall(name)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(dict[str, str], result)
+        return await cast("Awaitable[dict[bytes, bytes]]", client.hgetall(name))
 
     # List operations
 
     async def lpush(self, name: str, *values: str | bytes) -> int:
         """Prepend values to a list."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        # Convert bytes to strings if needed
-        str_values = [v.decode("utf-8") if isinstance(v, bytes) else v for v in values]
-
-        result: Any = self._client.lpush(name, *str_values)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(int, result)
+        return await cast("Awaitable[int]", client.lpush(name, *values))
 
     async def rpush(self, name: str, *values: str | bytes) -> int:
         """Append values to a list."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
-
-        # Convert bytes to strings if needed
-        str_values = [v.decode("utf-8") if isinstance(v, bytes) else v for v in values]
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.rpush(name, *str_values)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(int, result)
+        return await cast("Awaitable[int]", client.rpush(name, *values))
 
-    async def lpop(self, name: str) -> str | None:
+    async def lpop(self, name: str) -> bytes | None:
         """Remove and get the first element in a list."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.lpop(name)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(str | None, result)
+        return await cast("Awaitable[bytes | None]", client.lpop(name))
 
-    async def rpop(self, name: str) -> str | None:
+    async def rpop(self, name: str) -> bytes | None:
         """Remove and get the last element in a list."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
 
-        result: Any = self._client.rpop(name)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(str | None, result)
+        return await cast("Awaitable[bytes | None]", client.rpop(name))
 
-    async def lrange(self, name: str, start: int, end: int) -> list[str]:
+    async def lrange(self, name: str, start: int, end: int) -> list[bytes]:
         """Get a range of elements from a list."""
-        if not self._initialized:
-            await self.initialize()
-        if self._client is None:
-            raise ValueError(VALKEY_NOT_INITIALIZED)
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        return await cast("Awaitable[list[bytes]]", client.lrange(name, start, end))
+
+    # Pipelining
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[Pipeline]:
+        """
+        Buffer several commands and send them in one round trip.
+
+        The pipeline is non-transactional (no MULTI/EXEC); queue commands on
+        it and call ``await pipe.execute()`` to flush them.
+
+        Example:
+            async with valkey_client.pipeline() as pipe:
+                pipe.get("a")
+                pipe.get("b")
+                a, b = await pipe.execute()
+        """
+        client = self._client
+        if client is None:
+            client = await self._ensure_client()
+
+        async with client.pipeline(transaction=False) as pipe:
+            yield pipe
+
+    async def mget_many(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Get the values of several keys in a single round trip.
+
+        Returns:
+            Values in the same order as ``keys``; None for missing keys
+        """
+        if not keys:
+            return []
+
+        async with self.pipeline() as pipe:
+            for key in keys:
+                pipe.get(key)
+            return await pipe.execute()
+
+    async def set_many(self, items: list[tuple[str, bytes, int | None]]) -> bool:
+        """
+        Set several keys, each with its own expiry, in a single round trip.
+
+        Args:
+            items: (key, value, expire time in seconds) for each key to set
+
+        Returns:
+            True if every key was set, False otherwise
+        """
+        if not items:
+            return True
 
-        result: Any = self._client.lrange(name, start, end)
-        if hasattr(result, "__await__"):
-            result = await result
-        return cast(list[str], result)
+        async with self.pipeline() as pipe:
+            for key, value, ex in items:
+                pipe.set(key, value, ex=ex)
+            return all(await pipe.execute())
@@ -1,3 +1,6 @@
+import os
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # =====================================================================
@@ -29,8 +32,16 @@ class PostgresSettings(BaseSettings):
         None  # Password - Must be provided via environment variables in production
     )
     database: str = "pypi"  # Database name to connect to
-    min_connections: int = 1  # Minimum connections in pool (set higher in production)
-    max_connections: int = 10  # Maximum simultaneous connections allowed
+    min_connections: int = (
+        5  # Connections opened at startup and never reaped for inactivity
+    )
+    max_connections: int = Field(
+        default_factory=lambda: max(25, (os.cpu_count() or 1) * 4)
+    )  # Maximum simultaneous connections; sized for concurrent ASGI requests
+    max_inactive_connection_lifetime: float = (
+        300.0  # Seconds before idle pooled connections are closed
+    )
+    prepared_cache_size: int = 256  # Prepared statements kept per connection (LRU)
     statement_timeout: int | None = None  # Query timeout in seconds (None = no limit)
 
     model_config = SettingsConfigDict(env_prefix="POSTGRES_")
@@ -50,6 +61,13 @@ class S3Settings(BaseSettings):
     use_ssl: bool = True
     verify: bool = True
     default_bucket: str = "pypi"
+    # Bodies at or above this size are sent as parallel multipart uploads
+    multipart_threshold: int = 8 * 1024 * 1024
+    multipart_chunksize: int = 8 * 1024 * 1024
+    multipart_concurrency: int = 8
+    # Objects larger than one part are downloaded as parallel byte-range GETs
+    download_part_size: int = 16 * 1024 * 1024
+    download_concurrency: int = 8
 
     model_config = SettingsConfigDict(env_prefix="S3_")
 
@@ -124,6 +142,11 @@ class AuthSettings(BaseSettings):
     # Set to 0 for non-expiring keys (not recommended)
     # For CI/CD: 30-90 days recommended with rotation
 
+    api_key_pepper: str | None = None
+    # Server-side secret mixed into stored API key hashes
+    # Recommended in production so a leaked database alone can't check keys
+    # WARNING: Changing this invalidates all API keys hashed with it!
+
     model_config = SettingsConfigDict(env_prefix="AUTH_")
 
 
@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 from typing import Any
 
@@ -5,6 +6,9 @@ from pydantic import BaseModel, Field
 
 # Data models for projects, releases, and files following PyPI's schema
 
+# Runs of separators that PEP 503 collapses into a single hyphen
+_NORMALIZE_RE = re.compile(r"[-_.]+")
+
 
 class Project(BaseModel):
     """Package in the repository with metadata and versioning information."""
@@ -19,9 +23,7 @@ class Project(BaseModel):
     def __init__(self, **data: Any) -> None:
         if "normalized_name" not in data and "name" in data:
             # Auto-generate normalized_name from name
-            import re
-
-            data["normalized_name"] = re.sub(r"[-_.]+", "-", data["name"].lower())
+            data["normalized_name"] = _NORMALIZE_RE.sub("-", data["name"].lower())
         super().__init__(**data)
 
 
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
 from app.domain.models import File, Project, Release
@@ -12,9 +13,29 @@ class ProjectRepository(ABC):
         """Get all projects in the repository."""
         pass
 
+    @abstractmethod
+    def iter_project_names(self) -> AsyncIterator[str]:
+        """Stream the names of all projects without loading full rows."""
+        pass
+
+    @abstractmethod
+    def iter_project_versions(self) -> AsyncIterator[tuple[str, list[str]]]:
+        """Stream each project's name with its release versions, newest first."""
+        pass
+
     @abstractmethod
     async def get_project_by_name(self, name: str) -> Project | None:
-        """Get a project by name."""
+        """Get a project by its PEP 503 normalized name."""
+        pass
+
+    @abstractmethod
+    async def get_project_by_id(self, project_id: int) -> Project | None:
+        """Get a project by its primary key."""
+        pass
+
+    @abstractmethod
+    async def get_projects_by_names(self, names: list[str]) -> dict[str, Project]:
+        """Get projects by PEP 503 normalized name, keyed by that name."""
         pass
 
     @abstractmethod
@@ -46,16 +67,40 @@ class ReleaseRepository(ABC):
         """Get all releases for a project."""
         pass
 
+    @abstractmethod
+    def iter_all_releases(self, project_id: int) -> AsyncIterator[Release]:
+        """Stream all releases for a project without buffering the result set."""
+        pass
+
     @abstractmethod
     async def get_release(self, project_id: int, version: str) -> Release | None:
         """Get a release by project_id and version."""
         pass
 
+    @abstractmethod
+    async def get_release_with_files(
+        self, project_id: int, version: str
+    ) -> tuple[Release, list[File]] | None:
+        """Get a release and all of its files in a single query."""
+        pass
+
+    @abstractmethod
+    async def get_releases_by_classifier(self, classifier: str) -> list[Release]:
+        """Get all releases declaring a trove classifier."""
+        pass
+
     @abstractmethod
     async def create_release(self, release: Release) -> Release:
         """Create a new release."""
         pass
 
+    @abstractmethod
+    async def create_release_with_files(
+        self, release: Release, files: list[File]
+    ) -> tuple[Release, list[File]]:
+        """Create a release and its files in a single statement."""
+        pass
+
     @abstractmethod
     async def update_release(self, release: Release) -> Release:
         """Update an existing release."""
@@ -90,11 +135,21 @@ class FileRepository(ABC):
         """Get a file by filename within a release."""
         pass
 
+    @abstractmethod
+    async def get_files_by_classifier(self, classifier: str) -> list[File]:
+        """Get all files declaring a trove classifier."""
+        pass
+
     @abstractmethod
     async def create_file(self, file: File) -> File:
         """Create a new file."""
         pass
 
+    @abstractmethod
+    async def bulk_create_files(self, files: list[File]) -> list[File]:
+        """Create several files in as few round trips as possible."""
+        pass
+
     @abstractmethod
     async def update_file(self, file: File) -> File:
         """Update an existing file."""
@@ -125,8 +180,24 @@ class StorageRepository(ABC):
         pass
 
     @abstractmethod
-    async def put_file(self, path: str, content: bytes, content_type: str) -> bool:
-        """Store a file in storage."""
+    async def get_file_with_presence(self, path: str) -> bytes | None:
+        """Get a file from storage, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def stream_file(self, path: str) -> AsyncIterator[bytes]:
+        """Open a file in storage and return an iterator over its content."""
+        pass
+
+    @abstractmethod
+    async def put_file(
+        self,
+        path: str,
+        content: bytes,
+        content_type: str,
+        digests: tuple[str, str] | None = None,
+    ) -> bool:
+        """Store a file in storage, given its (MD5, SHA-256) digests if known."""
         pass
 
     @abstractmethod
@@ -158,6 +229,28 @@ class CacheRepository(ABC):
         """Set a value in cache."""
         pass
 
+    @abstractmethod
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Get a value from cache as the raw bytes it was stored as."""
+        pass
+
+    @abstractmethod
+    async def get_bytes_many(self, keys: list[str]) -> list[bytes | None]:
+        """Get several raw values in one round trip, None for missing keys."""
+        pass
+
+    @abstractmethod
+    async def set_bytes(
+        self, key: str, value: bytes, expire: int | None = None
+    ) -> bool:
+        """Set a value in cache from already serialized bytes."""
+        pass
+
+    @abstractmethod
+    async def set_bytes_many(self, items: list[tuple[str, bytes, int | None]]) -> bool:
+        """Set several (key, bytes, expire) entries in one round trip."""
+        pass
+
     @abstractmethod
     async def delete(self, key: str) -> bool:
         """Delete a value from cache."""
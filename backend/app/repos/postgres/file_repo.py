@@ -1,4 +1,3 @@
-import json
 from datetime import datetime
 from typing import Any
 
@@ -9,6 +8,148 @@ from app.repos.interfaces import FileRepository
 # Error messages
 CANNOT_CONVERT_NONE = "Cannot convert None to File object"
 
+# Columns written by create_file and bulk_create_files
+_INSERT_COLUMNS = """
+    release_id, filename, size, md5_digest, sha256_digest,
+    blake2_256_digest, uploaded_by, path, content_type,
+    packagetype, python_version, requires_python, has_signature,
+    has_metadata, metadata_sha256, is_yanked, yank_reason,
+    metadata_version, summary, description, description_content_type,
+    author, author_email, maintainer, maintainer_email, license,
+    keywords, classifiers, platform, home_page, download_url,
+    requires_dist, provides_dist, obsoletes_dist, requires_external,
+    project_urls
+"""
+_INSERT_COLUMN_COUNT = 36
+
+# Columns read back into File objects by the SELECT and RETURNING queries
+_FILE_COLUMNS = """
+    id, release_id, filename, size, md5_digest, sha256_digest,
+    blake2_256_digest, upload_time, uploaded_by, path, content_type,
+    packagetype, python_version, requires_python, has_signature,
+    has_metadata, metadata_sha256, is_yanked, yank_reason,
+    metadata_version, summary, description, description_content_type,
+    author, author_email, maintainer, maintainer_email, license,
+    keywords, classifiers, platform, home_page, download_url,
+    requires_dist, provides_dist, obsoletes_dist, requires_external,
+    project_urls
+"""
+
+# Rows per multi-row INSERT; keeps each statement well under Postgres's
+# 32767 bind parameter limit
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def _placeholders(row: int) -> str:
+    """Return the $n placeholders for the given row of a multi-row INSERT."""
+    first = row * _INSERT_COLUMN_COUNT + 1
+    return ", ".join(f"${n}" for n in range(first, first + _INSERT_COLUMN_COUNT))
+
+
+# Queries are module constants so each call reuses the same string, which is
+# also the key asyncpg's statement cache looks up
+_SQL_GET_FILES_FOR_RELEASE = f"""
+    SELECT {_FILE_COLUMNS}
+    FROM files
+    WHERE release_id = $1
+    ORDER BY filename
+"""  # noqa: S608
+
+_SQL_GET_FILES_BY_CLASSIFIER = f"""
+    SELECT {_FILE_COLUMNS}
+    FROM files
+    WHERE classifiers @> $1::jsonb
+    ORDER BY release_id, filename
+"""  # noqa: S608
+
+_SQL_GET_FILE_BY_FILENAME = f"""
+    SELECT {_FILE_COLUMNS}
+    FROM files
+    WHERE release_id = $1 AND filename = $2
+"""  # noqa: S608
+
+_SQL_CREATE_FILE = f"""
+    INSERT INTO files ({_INSERT_COLUMNS}) VALUES (
+        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15,
+        $16, $17, $18, $19, $20, $21, $22, $23, $24, $25, $26, $27, $28,
+        $29, $30, $31, $32, $33, $34, $35, $36
+    )
+    RETURNING {_FILE_COLUMNS}
+"""  # noqa: S608
+
+_SQL_UPDATE_FILE = f"""
+    UPDATE files
+    SET
+        size = $3,
+        md5_digest = $4,
+        sha256_digest = $5,
+        blake2_256_digest = $6,
+        uploaded_by = $7,
+        path = $8,
+        content_type = $9,
+        packagetype = $10,
+        python_version = $11,
+        requires_python = $12,
+        has_signature = $13,
+        has_metadata = $14,
+        metadata_sha256 = $15,
+        is_yanked = $16,
+        yank_reason = $17,
+        metadata_version = $18,
+        summary = $19,
+        description = $20,
+        description_content_type = $21,
+        author = $22,
+        author_email = $23,
+        maintainer = $24,
+        maintainer_email = $25,
+        license = $26,
+        keywords = $27,
+        classifiers = $28,
+        platform = $29,
+        home_page = $30,
+        download_url = $31,
+        requires_dist = $32,
+        provides_dist = $33,
+        obsoletes_dist = $34,
+        requires_external = $35,
+        project_urls = $36,
+        download_count = $37,
+        last_download = $38,
+        download_stats = $39
+    WHERE id = $1 AND release_id = $2
+    RETURNING {_FILE_COLUMNS}, download_count, last_download, download_stats
+"""  # noqa: S608
+
+_SQL_DELETE_FILE = """
+    DELETE FROM files
+    WHERE id = $1
+    RETURNING 1
+"""
+
+_SQL_YANK_FILE = """
+    UPDATE files
+    SET is_yanked = TRUE, yank_reason = $2
+    WHERE id = $1
+    RETURNING 1
+"""
+
+_SQL_UNYANK_FILE = """
+    UPDATE files
+    SET is_yanked = FALSE, yank_reason = NULL
+    WHERE id = $1
+    RETURNING 1
+"""
+
+_SQL_UPDATE_DOWNLOAD_STATS = """
+    UPDATE files
+    SET
+        download_count = download_count + $2,
+        last_download = NOW()
+    WHERE id = $1
+    RETURNING 1
+"""
+
 
 class PostgresFileRepository(FileRepository):
     """Repository for managing package file storage and retrieval in PostgreSQL."""
@@ -20,96 +161,71 @@ class PostgresFileRepository(FileRepository):
         """
         Get all files for a release.
 
-        Uses the indexed release_id column for efficient lookup, then sorts by
-        filename which is commonly the order needed by clients.
-        This query benefits from a compound index on (release_id, filename).
+        Files come back ordered by filename, the order clients commonly need;
+        the lookup and the ORDER BY filename are both served by the UNIQUE
+        (release_id, filename) index, so the planner can skip its Sort node.
         """
-        query = """
-        SELECT
-            id, release_id, filename, size, md5_digest, sha256_digest,
-            blake2_256_digest, upload_time, uploaded_by, path, content_type,
-            packagetype, python_version, requires_python, has_signature,
-            has_metadata, metadata_sha256, is_yanked, yank_reason,
-            metadata_version, summary, description, description_content_type,
-            author, author_email, maintainer, maintainer_email, license,
-            keywords, classifiers, platform, home_page, download_url,
-            requires_dist, provides_dist, obsoletes_dist, requires_external,
-            project_urls
-        FROM files
-        WHERE release_id = $1
-        ORDER BY filename
+        rows = await self.postgres.fetch(_SQL_GET_FILES_FOR_RELEASE, release_id)
+        return [self._row_to_file(row) for row in rows]
+
+    async def get_files_by_classifier(self, classifier: str) -> list[File]:
         """
-        rows = await self.postgres.fetch(query, release_id)
+        Get all files declaring a trove classifier.
+
+        The containment test is served by the jsonb_path_ops GIN index on
+        files.classifiers.
+        """
+        rows = await self.postgres.fetch(_SQL_GET_FILES_BY_CLASSIFIER, [classifier])
         return [self._row_to_file(row) for row in rows]
 
     async def get_file_by_filename(self, release_id: int, filename: str) -> File | None:
         """Get a file by filename within a release."""
-        query = """
-        SELECT
-            id, release_id, filename, size, md5_digest, sha256_digest,
-            blake2_256_digest, upload_time, uploaded_by, path, content_type,
-            packagetype, python_version, requires_python, has_signature,
-            has_metadata, metadata_sha256, is_yanked, yank_reason,
-            metadata_version, summary, description, description_content_type,
-            author, author_email, maintainer, maintainer_email, license,
-            keywords, classifiers, platform, home_page, download_url,
-            requires_dist, provides_dist, obsoletes_dist, requires_external,
-            project_urls
-        FROM files
-        WHERE release_id = $1 AND filename = $2
-        """
-        row = await self.postgres.fetchrow(query, release_id, filename)
+        row = await self.postgres.fetchrow(
+            _SQL_GET_FILE_BY_FILENAME, release_id, filename
+        )
         if row is None:
             return None
         return self._row_to_file(row)
 
     async def create_file(self, file: File) -> File:
         """Create a new file."""
-        # Convert list fields to JSON strings for PostgreSQL
-        classifiers_json = json.dumps(file.classifiers) if file.classifiers else "[]"
-        requires_dist_json = (
-            json.dumps(file.requires_dist) if file.requires_dist else "[]"
-        )
-        provides_dist_json = (
-            json.dumps(file.provides_dist) if file.provides_dist else "[]"
-        )
-        obsoletes_dist_json = (
-            json.dumps(file.obsoletes_dist) if file.obsoletes_dist else "[]"
-        )
-        requires_external_json = (
-            json.dumps(file.requires_external) if file.requires_external else "[]"
-        )
-        project_urls_json = json.dumps(file.project_urls) if file.project_urls else "{}"
-
-        query = """
-        INSERT INTO files (
-            release_id, filename, size, md5_digest, sha256_digest,
-            blake2_256_digest, uploaded_by, path, content_type,
-            packagetype, python_version, requires_python, has_signature,
-            has_metadata, metadata_sha256, is_yanked, yank_reason,
-            metadata_version, summary, description, description_content_type,
-            author, author_email, maintainer, maintainer_email, license,
-            keywords, classifiers, platform, home_page, download_url,
-            requires_dist, provides_dist, obsoletes_dist, requires_external,
-            project_urls
-        ) VALUES (
-            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15,
-            $16, $17, $18, $19, $20, $21, $22, $23, $24, $25, $26, $27, $28,
-            $29, $30, $31, $32, $33, $34, $35, $36
-        )
-        RETURNING
-            id, release_id, filename, size, md5_digest, sha256_digest,
-            blake2_256_digest, upload_time, uploaded_by, path, content_type,
-            packagetype, python_version, requires_python, has_signature,
-            has_metadata, metadata_sha256, is_yanked, yank_reason,
-            metadata_version, summary, description, description_content_type,
-            author, author_email, maintainer, maintainer_email, license,
-            keywords, classifiers, platform, home_page, download_url,
-            requires_dist, provides_dist, obsoletes_dist, requires_external,
-            project_urls
+        row = await self.postgres.fetchrow(_SQL_CREATE_FILE, *self._insert_args(file))
+        return self._row_to_file(row)
+
+    async def bulk_create_files(self, files: list[File]) -> list[File]:
         """
-        row = await self.postgres.fetchrow(
-            query,
+        Create many files with multi-row INSERT statements.
+
+        Rows are sent in batches of up to BULK_INSERT_BATCH_SIZE, so each batch
+        costs one round trip and one parse/plan instead of one per file. All
+        batches run in one transaction, so either every file is created or,
+        if any batch fails, none are.
+        """
+        created: list[File] = []
+        async with self.postgres.pipeline() as conn, conn.transaction():
+            for start in range(0, len(files), BULK_INSERT_BATCH_SIZE):
+                batch = files[start : start + BULK_INSERT_BATCH_SIZE]
+                # Only column names and $n placeholders are interpolated; all
+                # values are still sent as bind parameters
+                values = ", ".join(f"({_placeholders(i)})" for i in range(len(batch)))
+                query = f"""
+                INSERT INTO files ({_INSERT_COLUMNS})
+                VALUES {values}
+                RETURNING {_FILE_COLUMNS}
+                """  # noqa: S608
+                args = [arg for file in batch for arg in self._insert_args(file)]
+                # The statement text varies with the batch size, so prepare it
+                # explicitly rather than letting it evict the static queries
+                # from the connection's statement cache
+                statement = await conn.prepare(query)
+                rows = await statement.fetch(*args)
+                created.extend(self._row_to_file(row) for row in rows)
+        return created
+
+    @staticmethod
+    def _insert_args(file: File) -> tuple[Any, ...]:
+        """Build the INSERT parameters for a file, in _INSERT_COLUMNS order."""
+        return (
             file.release_id,
             file.filename,
             file.size,
@@ -137,93 +253,21 @@ class PostgresFileRepository(FileRepository):
             file.maintainer_email,
             file.license,
             file.keywords,
-            classifiers_json,
+            file.classifiers or [],
             file.platform,
             file.home_page,
             file.download_url,
-            requires_dist_json,
-            provides_dist_json,
-            obsoletes_dist_json,
-            requires_external_json,
-            project_urls_json,
+            file.requires_dist or [],
+            file.provides_dist or [],
+            file.obsoletes_dist or [],
+            file.requires_external or [],
+            file.project_urls or {},
         )
-        return self._row_to_file(row)
 
     async def update_file(self, file: File) -> File:
         """Update an existing file."""
-        # Convert list fields to JSON strings for PostgreSQL
-        classifiers_json = json.dumps(file.classifiers) if file.classifiers else "[]"
-        requires_dist_json = (
-            json.dumps(file.requires_dist) if file.requires_dist else "[]"
-        )
-        provides_dist_json = (
-            json.dumps(file.provides_dist) if file.provides_dist else "[]"
-        )
-        obsoletes_dist_json = (
-            json.dumps(file.obsoletes_dist) if file.obsoletes_dist else "[]"
-        )
-        requires_external_json = (
-            json.dumps(file.requires_external) if file.requires_external else "[]"
-        )
-        project_urls_json = json.dumps(file.project_urls) if file.project_urls else "{}"
-        download_stats_json = (
-            json.dumps(file.download_stats) if file.download_stats else "{}"
-        )
-
-        query = """
-        UPDATE files
-        SET
-            size = $3,
-            md5_digest = $4,
-            sha256_digest = $5,
-            blake2_256_digest = $6,
-            uploaded_by = $7,
-            path = $8,
-            content_type = $9,
-            packagetype = $10,
-            python_version = $11,
-            requires_python = $12,
-            has_signature = $13,
-            has_metadata = $14,
-            metadata_sha256 = $15,
-            is_yanked = $16,
-            yank_reason = $17,
-            metadata_version = $18,
-            summary = $19,
-            description = $20,
-            description_content_type = $21,
-            author = $22,
-            author_email = $23,
-            maintainer = $24,
-            maintainer_email = $25,
-            license = $26,
-            keywords = $27,
-            classifiers = $28,
-            platform = $29,
-            home_page = $30,
-            download_url = $31,
-            requires_dist = $32,
-            provides_dist = $33,
-            obsoletes_dist = $34,
-            requires_external = $35,
-            project_urls = $36,
-            download_count = $37,
-            last_download = $38,
-            download_stats = $39
-        WHERE id = $1 AND release_id = $2
-        RETURNING
-            id, release_id, filename, size, md5_digest, sha256_digest,
-            blake2_256_digest, upload_time, uploaded_by, path, content_type,
-            packagetype, python_version, requires_python, has_signature,
-            has_metadata, metadata_sha256, is_yanked, yank_reason,
-            metadata_version, summary, description, description_content_type,
-            author, author_email, maintainer, maintainer_email, license,
-            keywords, classifiers, platform, home_page, download_url,
-            requires_dist, provides_dist, obsoletes_dist, requires_external,
-            project_urls, download_count, last_download, download_stats
-        """
         row = await self.postgres.fetchrow(
-            query,
+            _SQL_UPDATE_FILE,
             file.id,
             file.release_id,
             file.size,
@@ -251,49 +295,35 @@ class PostgresFileRepository(FileRepository):
             file.maintainer_email,
             file.license,
             file.keywords,
-            classifiers_json,
+            file.classifiers or [],
             file.platform,
             file.home_page,
             file.download_url,
-            requires_dist_json,
-            provides_dist_json,
-            obsoletes_dist_json,
-            requires_external_json,
-            project_urls_json,
+            file.requires_dist or [],
+            file.provides_dist or [],
+            file.obsoletes_dist or [],
+            file.requires_external or [],
+            file.project_urls or {},
             file.download_count,
             file.last_download,
-            download_stats_json,
+            file.download_stats or {},
         )
         return self._row_to_file(row)
 
     async def delete_file(self, file_id: int) -> bool:
         """Delete a file."""
-        query = """
-        DELETE FROM files
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, file_id)
-        return "DELETE 1" in result
+        result = await self.postgres.fetchval(_SQL_DELETE_FILE, file_id)
+        return result is not None
 
     async def yank_file(self, file_id: int, reason: str | None = None) -> bool:
         """Mark a file as yanked."""
-        query = """
-        UPDATE files
-        SET is_yanked = TRUE, yank_reason = $2
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, file_id, reason)
-        return "UPDATE 1" in result
+        result = await self.postgres.fetchval(_SQL_YANK_FILE, file_id, reason)
+        return result is not None
 
     async def unyank_file(self, file_id: int) -> bool:
         """Unmark a file as yanked."""
-        query = """
-        UPDATE files
-        SET is_yanked = FALSE, yank_reason = NULL
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, file_id)
-        return "UPDATE 1" in result
+        result = await self.postgres.fetchval(_SQL_UNYANK_FILE, file_id)
+        return result is not None
 
     async def update_download_stats(self, file_id: int, increment_by: int = 1) -> bool:
         """
@@ -306,15 +336,10 @@ class PostgresFileRepository(FileRepository):
         Returns:
             True if successful, False otherwise
         """
-        query = """
-        UPDATE files
-        SET
-            download_count = download_count + $2,
-            last_download = NOW()
-        WHERE id = $1
-        """
         try:
-            result = await self.postgres.execute(query, file_id, increment_by)
+            result = await self.postgres.fetchval(
+                _SQL_UPDATE_DOWNLOAD_STATS, file_id, increment_by
+            )
         except Exception:
             import logging
 
@@ -323,50 +348,28 @@ class PostgresFileRepository(FileRepository):
             )
             return False
         else:
-            return "UPDATE 1" in result
+            return result is not None
 
     def _row_to_file(self, row: dict[str, Any] | None) -> File:
         """Transform database row into File domain object with JSON field parsing."""
         if row is None:
             raise ValueError(CANNOT_CONVERT_NONE)
 
-        # Parse JSON strings for list and dict fields
-        def parse_json_list(value: Any) -> list[Any]:
-            if isinstance(value, str):
-                try:
-                    result = json.loads(value)
-                except json.JSONDecodeError:
-                    return []
-                else:
-                    if isinstance(result, list):
-                        return result
-                    return []
-            return value or []
-
-        def parse_json_dict(value: Any) -> dict[str, Any]:
-            if isinstance(value, str):
-                try:
-                    result = json.loads(value)
-                except json.JSONDecodeError:
-                    return {}
-                else:
-                    if isinstance(result, dict):
-                        return result
-                    return {}
-            return value or {}
-
-        # Handle JSONB columns
-        classifiers = parse_json_list(row.get("classifiers"))
-        requires_dist = parse_json_list(row.get("requires_dist"))
-        provides_dist = parse_json_list(row.get("provides_dist"))
-        obsoletes_dist = parse_json_list(row.get("obsoletes_dist"))
-        requires_external = parse_json_list(row.get("requires_external"))
-        project_urls = parse_json_dict(row.get("project_urls"))
+        # JSONB columns are decoded by the connection codec; NULLs become empty
+        classifiers = row.get("classifiers") or []
+        requires_dist = row.get("requires_dist") or []
+        provides_dist = row.get("provides_dist") or []
+        obsoletes_dist = row.get("obsoletes_dist") or []
+        requires_external = row.get("requires_external") or []
+        project_urls = row.get("project_urls") or {}
 
         # Handle download statistics
-        download_stats = parse_json_dict(row.get("download_stats"))
+        download_stats = row.get("download_stats") or {}
 
-        return File(
+        # Column types already match the model, so skip pydantic validation;
+        # this runs once per row on every listing query. Nullable columns
+        # backing non-optional fields fall back to the model default by hand
+        return File.model_construct(
             id=row["id"],
             release_id=row["release_id"],
             filename=row["filename"],
@@ -374,17 +377,17 @@ class PostgresFileRepository(FileRepository):
             md5_digest=row.get("md5_digest"),
             sha256_digest=row["sha256_digest"],
             blake2_256_digest=row.get("blake2_256_digest"),
-            upload_time=row.get("upload_time", datetime.utcnow()),
+            upload_time=row.get("upload_time") or datetime.utcnow(),
             uploaded_by=row.get("uploaded_by"),
             path=row["path"],
             content_type=row["content_type"],
             packagetype=row["packagetype"],
             python_version=row["python_version"],
             requires_python=row.get("requires_python"),
-            has_signature=row.get("has_signature", False),
-            has_metadata=row.get("has_metadata", False),
+            has_signature=row.get("has_signature") or False,
+            has_metadata=row.get("has_metadata") or False,
             metadata_sha256=row.get("metadata_sha256"),
-            is_yanked=row.get("is_yanked", False),
+            is_yanked=row.get("is_yanked") or False,
             yank_reason=row.get("yank_reason"),
             metadata_version=row.get("metadata_version"),
             summary=row.get("summary"),
@@ -406,7 +409,7 @@ class PostgresFileRepository(FileRepository):
             requires_external=requires_external,
             project_urls=project_urls,
             # Add download statistics
-            download_count=row.get("download_count", 0),
+            download_count=row.get("download_count") or 0,
             last_download=row.get("last_download"),
             download_stats=download_stats,
         )
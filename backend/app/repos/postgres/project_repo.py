@@ -1,4 +1,4 @@
-import re
+from collections.abc import AsyncIterator
 from string import Template
 
 from app.core.clients.postgres import PostgresClient
@@ -10,11 +10,6 @@ PROJECT_CREATE_ERROR = Template("Failed to create project: $name")
 PROJECT_UPDATE_ERROR = Template("Failed to update project: $name")
 
 
-def normalize_name(name: str) -> str:
-    """Normalize a package name according to PEP 503."""
-    return re.sub(r"[-_.]+", "-", name.lower())
-
-
 class PostgresProjectRepository(ProjectRepository):
     """PostgreSQL implementation of the project repository."""
 
@@ -28,22 +23,89 @@ class PostgresProjectRepository(ProjectRepository):
         FROM projects
         ORDER BY normalized_name
         """
-        rows = await self.postgres.fetch(query)
-        return [Project(**row) for row in rows]
+        # Stream rows so each record can be released once it's converted,
+        # rather than holding every record and every Project at once. Rows
+        # always carry normalized_name and match the model's types, so skip
+        # validation and the name normalization in Project.__init__
+        return [
+            Project.model_construct(**row) async for row in self.postgres.cursor(query)
+        ]
+
+    async def iter_project_names(self) -> AsyncIterator[str]:
+        """Stream the names of all projects without loading full rows."""
+        query = """
+        SELECT name
+        FROM projects
+        ORDER BY normalized_name
+        """
+        async for record in self.postgres.cursor(query):
+            yield record["name"]
+
+    async def iter_project_versions(self) -> AsyncIterator[tuple[str, list[str]]]:
+        """
+        Stream each project's name with its release versions, newest first.
+
+        The versions of every project are aggregated by one query, instead of
+        a releases lookup per project.
+        """
+        query = """
+        SELECT
+            p.name,
+            COALESCE(
+                array_agg(r.version ORDER BY r.uploaded_at DESC)
+                    FILTER (WHERE r.id IS NOT NULL),
+                '{}'
+            ) AS versions
+        FROM projects p
+        LEFT JOIN releases r ON r.project_id = p.id
+        GROUP BY p.id
+        ORDER BY p.normalized_name
+        """
+        async for record in self.postgres.cursor(query):
+            yield record["name"], record["versions"]
 
     async def get_project_by_name(self, name: str) -> Project | None:
-        """Get a project by name."""
-        normalized_name = normalize_name(name)
+        """Get a project by its PEP 503 normalized name."""
         query = """
         SELECT id, name, normalized_name, description, created_at, updated_at
         FROM projects
         WHERE normalized_name = $1
         """
-        row = await self.postgres.fetchrow(query, normalized_name)
+        row = await self.postgres.fetchrow(query, name)
         if row is None:
             return None
         return Project(**row)
 
+    async def get_project_by_id(self, project_id: int) -> Project | None:
+        """Get a project by its primary key."""
+        query = """
+        SELECT id, name, normalized_name, description, created_at, updated_at
+        FROM projects
+        WHERE id = $1
+        """
+        row = await self.postgres.fetchrow(query, project_id)
+        if row is None:
+            return None
+        return Project(**row)
+
+    async def get_projects_by_names(self, names: list[str]) -> dict[str, Project]:
+        """
+        Get projects by PEP 503 normalized name, keyed by that name.
+
+        Looks up every name in a single query, so resolving N projects costs
+        one round trip instead of N. Names with no project are left out.
+        """
+        if not names:
+            return {}
+
+        query = """
+        SELECT id, name, normalized_name, description, created_at, updated_at
+        FROM projects
+        WHERE normalized_name = ANY($1::text[])
+        """
+        rows = await self.postgres.fetch(query, names)
+        return {row["normalized_name"]: Project(**row) for row in rows}
+
     async def create_project(self, project: Project) -> Project:
         """Create a new project."""
         query = """
@@ -56,7 +118,7 @@ class PostgresProjectRepository(ProjectRepository):
         )
         if row is None:
             raise ValueError(PROJECT_CREATE_ERROR.substitute(name=project.name))
-        return Project(**dict(row))
+        return Project(**row)
 
     async def update_project(self, project: Project) -> Project:
         """Update an existing project."""
@@ -71,16 +133,17 @@ class PostgresProjectRepository(ProjectRepository):
         )
         if row is None:
             raise ValueError(PROJECT_UPDATE_ERROR.substitute(name=project.name))
-        return Project(**dict(row))
+        return Project(**row)
 
     async def delete_project(self, project_id: int) -> bool:
         """Delete a project."""
         query = """
         DELETE FROM projects
         WHERE id = $1
+        RETURNING 1
         """
-        result = await self.postgres.execute(query, project_id)
-        return "DELETE 1" in result
+        result = await self.postgres.fetchval(query, project_id)
+        return result is not None
 
     async def search_projects(self, query: str) -> list[Project]:
         """Search for projects."""
@@ -88,11 +151,11 @@ class PostgresProjectRepository(ProjectRepository):
         SELECT id, name, normalized_name, description, created_at, updated_at
         FROM projects
         WHERE
-            normalized_name LIKE $1 OR
-            name ILIKE $1 OR
-            description ILIKE $1
+            -- Must match the idx_projects_search_trgm expression exactly
+            (normalized_name || ' ' || name || ' ' || coalesce(description, ''))
+                ILIKE $1
         ORDER BY normalized_name
         """
         pattern = f"%{query}%"
         rows = await self.postgres.fetch(search_query, pattern)
-        return [Project(**row) for row in rows]
+        return [Project.model_construct(**row) for row in rows]
@@ -1,76 +1,96 @@
-import json
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
 from app.core.clients.postgres import PostgresClient
-from app.domain.models import Release
+from app.domain.models import File, Release
 from app.repos.interfaces import ReleaseRepository
 
+# Error messages
+CANNOT_CREATE_RELEASE = "Failed to create release"
 
-class PostgresReleaseRepository(ReleaseRepository):
-    """PostgreSQL implementation of the release repository."""
+# Queries are module constants so each call reuses the same string, which is
+# also the key asyncpg's statement cache looks up
+_SQL_GET_ALL_RELEASES = """
+    SELECT
+        id, project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, uploaded_at, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+    FROM releases
+    WHERE project_id = $1
+    ORDER BY uploaded_at DESC
+"""
 
-    def __init__(self, postgres: PostgresClient):
-        self.postgres = postgres
+_SQL_GET_RELEASES_BY_CLASSIFIER = """
+    SELECT
+        id, project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, uploaded_at, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+    FROM releases
+    WHERE classifiers @> $1::jsonb
+    ORDER BY project_id, uploaded_at DESC
+"""
 
-    async def get_all_releases(self, project_id: int) -> list[Release]:
-        """Get all releases for a project."""
-        query = """
-        SELECT
-            id, project_id, version, requires_python, is_prerelease,
-            yanked, yank_reason, uploaded_at, summary, description,
-            author, author_email, maintainer, maintainer_email,
-            license, keywords, classifiers, platform, home_page,
-            download_url, requires_dist, provides_dist, obsoletes_dist,
-            requires_external, project_urls
-        FROM releases
-        WHERE project_id = $1
-        ORDER BY uploaded_at DESC
-        """
-        rows = await self.postgres.fetch(query, project_id)
-        return [self._row_to_release(row) for row in rows]
+_SQL_GET_RELEASE = """
+    SELECT
+        id, project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, uploaded_at, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+    FROM releases
+    WHERE project_id = $1 AND version = $2
+"""
 
-    async def get_release(self, project_id: int, version: str) -> Release | None:
-        """Get a release by project_id and version."""
-        query = """
-        SELECT
-            id, project_id, version, requires_python, is_prerelease,
-            yanked, yank_reason, uploaded_at, summary, description,
-            author, author_email, maintainer, maintainer_email,
-            license, keywords, classifiers, platform, home_page,
-            download_url, requires_dist, provides_dist, obsoletes_dist,
-            requires_external, project_urls
-        FROM releases
-        WHERE project_id = $1 AND version = $2
-        """
-        row = await self.postgres.fetchrow(query, project_id, version)
-        if row is None:
-            return None
-        return self._row_to_release(row)
+_SQL_GET_RELEASE_WITH_FILES = """
+    SELECT
+        r.id, r.project_id, r.version, r.requires_python, r.is_prerelease,
+        r.yanked, r.yank_reason, r.uploaded_at, r.summary, r.description,
+        r.author, r.author_email, r.maintainer, r.maintainer_email,
+        r.license, r.keywords, r.classifiers, r.platform, r.home_page,
+        r.download_url, r.requires_dist, r.provides_dist, r.obsoletes_dist,
+        r.requires_external, r.project_urls,
+        coalesce(
+            jsonb_agg(to_jsonb(f) ORDER BY f.filename)
+                FILTER (WHERE f.id IS NOT NULL),
+            '[]'::jsonb
+        ) AS files
+    FROM releases r
+    LEFT JOIN files f ON f.release_id = r.id
+    WHERE r.project_id = $1 AND r.version = $2
+    GROUP BY r.id
+"""
 
-    async def create_release(self, release: Release) -> Release:
-        """Create a new release."""
-        # Convert list fields to JSON strings for PostgreSQL
-        classifiers_json = (
-            json.dumps(release.classifiers) if release.classifiers else "[]"
-        )
-        requires_dist_json = (
-            json.dumps(release.requires_dist) if release.requires_dist else "[]"
-        )
-        provides_dist_json = (
-            json.dumps(release.provides_dist) if release.provides_dist else "[]"
-        )
-        obsoletes_dist_json = (
-            json.dumps(release.obsoletes_dist) if release.obsoletes_dist else "[]"
-        )
-        requires_external_json = (
-            json.dumps(release.requires_external) if release.requires_external else "[]"
-        )
-        project_urls_json = (
-            json.dumps(release.project_urls) if release.project_urls else "{}"
-        )
+_SQL_CREATE_RELEASE = """
+    INSERT INTO releases (
+        project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13,
+        $14, $15, $16, $17, $18, $19, $20, $21, $22, $23
+    )
+    RETURNING
+        id, project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, uploaded_at, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+"""
 
-        query = """
+_SQL_CREATE_RELEASE_WITH_FILES = """
+    WITH rel AS (
         INSERT INTO releases (
             project_id, version, requires_python, is_prerelease,
             yanked, yank_reason, summary, description,
@@ -89,9 +109,175 @@ class PostgresReleaseRepository(ReleaseRepository):
             license, keywords, classifiers, platform, home_page,
             download_url, requires_dist, provides_dist, obsoletes_dist,
             requires_external, project_urls
+    ), new_files AS (
+        INSERT INTO files (
+            release_id, filename, size, md5_digest, sha256_digest,
+            blake2_256_digest, uploaded_by, path, content_type,
+            packagetype, python_version, requires_python, has_signature,
+            has_metadata, metadata_sha256, is_yanked, yank_reason,
+            metadata_version, summary, description, description_content_type,
+            author, author_email, maintainer, maintainer_email, license,
+            keywords, classifiers, platform, home_page, download_url,
+            requires_dist, provides_dist, obsoletes_dist, requires_external,
+            project_urls
+        )
+        SELECT
+            rel.id, f.filename, f.size, f.md5_digest, f.sha256_digest,
+            f.blake2_256_digest, f.uploaded_by, f.path, f.content_type,
+            f.packagetype, f.python_version, f.requires_python, f.has_signature,
+            f.has_metadata, f.metadata_sha256, f.is_yanked, f.yank_reason,
+            f.metadata_version, f.summary, f.description,
+            f.description_content_type, f.author, f.author_email, f.maintainer,
+            f.maintainer_email, f.license, f.keywords, f.classifiers, f.platform,
+            f.home_page, f.download_url, f.requires_dist, f.provides_dist,
+            f.obsoletes_dist, f.requires_external, f.project_urls
+        FROM rel, jsonb_populate_recordset(NULL::files, $24::jsonb) AS f
+        RETURNING *
+    )
+    SELECT
+        rel.*,
+        coalesce(
+            (SELECT jsonb_agg(to_jsonb(nf) ORDER BY nf.filename) FROM new_files nf),
+            '[]'::jsonb
+        ) AS files
+    FROM rel
+"""
+
+_SQL_UPDATE_RELEASE = """
+    UPDATE releases
+    SET
+        requires_python = $3,
+        is_prerelease = $4,
+        yanked = $5,
+        yank_reason = $6,
+        summary = $7,
+        description = $8,
+        author = $9,
+        author_email = $10,
+        maintainer = $11,
+        maintainer_email = $12,
+        license = $13,
+        keywords = $14,
+        classifiers = $15,
+        platform = $16,
+        home_page = $17,
+        download_url = $18,
+        requires_dist = $19,
+        provides_dist = $20,
+        obsoletes_dist = $21,
+        requires_external = $22,
+        project_urls = $23
+    WHERE id = $1 AND project_id = $2
+    RETURNING
+        id, project_id, version, requires_python, is_prerelease,
+        yanked, yank_reason, uploaded_at, summary, description,
+        author, author_email, maintainer, maintainer_email,
+        license, keywords, classifiers, platform, home_page,
+        download_url, requires_dist, provides_dist, obsoletes_dist,
+        requires_external, project_urls
+"""
+
+_SQL_DELETE_RELEASE = """
+    DELETE FROM releases
+    WHERE id = $1
+    RETURNING 1
+"""
+
+_SQL_YANK_RELEASE = """
+    UPDATE releases
+    SET yanked = TRUE, yank_reason = $2
+    WHERE id = $1
+    RETURNING 1
+"""
+
+_SQL_UNYANK_RELEASE = """
+    UPDATE releases
+    SET yanked = FALSE, yank_reason = NULL
+    WHERE id = $1
+    RETURNING 1
+"""
+
+
+class PostgresReleaseRepository(ReleaseRepository):
+    """PostgreSQL implementation of the release repository."""
+
+    def __init__(self, postgres: PostgresClient):
+        self.postgres = postgres
+
+    async def get_all_releases(self, project_id: int) -> list[Release]:
+        """Get all releases for a project."""
+        rows = await self.postgres.fetch(_SQL_GET_ALL_RELEASES, project_id)
+        return [self._row_to_release(row) for row in rows]
+
+    async def iter_all_releases(self, project_id: int) -> AsyncIterator[Release]:
+        """Stream all releases for a project without buffering the result set."""
+        async for row in self.postgres.cursor(_SQL_GET_ALL_RELEASES, project_id):
+            yield self._row_to_release(row)
+
+    async def get_releases_by_classifier(self, classifier: str) -> list[Release]:
+        """
+        Get all releases declaring a trove classifier.
+
+        The containment test is served by the jsonb_path_ops GIN index on
+        releases.classifiers.
+        """
+        rows = await self.postgres.fetch(_SQL_GET_RELEASES_BY_CLASSIFIER, [classifier])
+        return [self._row_to_release(row) for row in rows]
+
+    async def get_release(self, project_id: int, version: str) -> Release | None:
+        """Get a release by project_id and version."""
+        row = await self.postgres.fetchrow(_SQL_GET_RELEASE, project_id, version)
+        if row is None:
+            return None
+        return self._row_to_release(row)
+
+    async def get_release_with_files(
+        self, project_id: int, version: str
+    ) -> tuple[Release, list[File]] | None:
+        """
+        Get a release and all of its files in a single query.
+
+        The files are aggregated into a JSONB array server-side, so the release
+        page costs one round trip instead of a get_release followed by a
+        get_files_for_release.
+        """
+        row = await self.postgres.fetchrow(
+            _SQL_GET_RELEASE_WITH_FILES, project_id, version
+        )
+        if row is None:
+            return None
+
+        return self._row_to_release(row), self._json_to_files(row["files"])
+
+    async def create_release(self, release: Release) -> Release:
+        """Create a new release."""
+        row = await self.postgres.fetchrow(
+            _SQL_CREATE_RELEASE, *self._insert_args(release)
+        )
+        return self._row_to_release(row)
+
+    async def create_release_with_files(
+        self, release: Release, files: list[File]
+    ) -> tuple[Release, list[File]]:
         """
+        Create a release and its files in a single statement.
+
+        The files are sent as one JSONB array and expanded server-side with
+        jsonb_populate_recordset, so the whole upload costs one round trip and
+        one plan, and the release and files are inserted atomically.
+        """
+        file_rows = [file.model_dump(mode="json") for file in files]
         row = await self.postgres.fetchrow(
-            query,
+            _SQL_CREATE_RELEASE_WITH_FILES, *self._insert_args(release), file_rows
+        )
+        if row is None:
+            raise ValueError(CANNOT_CREATE_RELEASE)
+        return self._row_to_release(row), self._json_to_files(row["files"])
+
+    @staticmethod
+    def _insert_args(release: Release) -> tuple[Any, ...]:
+        """Build the INSERT parameters for a release, in column order."""
+        return (
             release.project_id,
             release.version,
             release.requires_python,
@@ -106,55 +292,31 @@ class PostgresReleaseRepository(ReleaseRepository):
             release.maintainer_email,
             release.license,
             release.keywords,
-            classifiers_json,
+            release.classifiers or [],
             release.platform,
             release.home_page,
             release.download_url,
-            requires_dist_json,
-            provides_dist_json,
-            obsoletes_dist_json,
-            requires_external_json,
-            project_urls_json,
+            release.requires_dist or [],
+            release.provides_dist or [],
+            release.obsoletes_dist or [],
+            release.requires_external or [],
+            release.project_urls or {},
         )
-        return self._row_to_release(row)
+
+    @staticmethod
+    def _json_to_files(items: list[dict[str, Any]]) -> list[File]:
+        """Build File objects from file rows aggregated into a JSONB array."""
+        # Timestamps arrive as JSON strings here, so let pydantic parse them;
+        # dropping NULLs lets the model defaults fill the empty JSONB columns
+        return [
+            File.model_validate({k: v for k, v in item.items() if v is not None})
+            for item in items
+        ]
 
     async def update_release(self, release: Release) -> Release:
         """Update an existing release."""
-        query = """
-        UPDATE releases
-        SET
-            requires_python = $3,
-            is_prerelease = $4,
-            yanked = $5,
-            yank_reason = $6,
-            summary = $7,
-            description = $8,
-            author = $9,
-            author_email = $10,
-            maintainer = $11,
-            maintainer_email = $12,
-            license = $13,
-            keywords = $14,
-            classifiers = $15,
-            platform = $16,
-            home_page = $17,
-            download_url = $18,
-            requires_dist = $19,
-            provides_dist = $20,
-            obsoletes_dist = $21,
-            requires_external = $22,
-            project_urls = $23
-        WHERE id = $1 AND project_id = $2
-        RETURNING
-            id, project_id, version, requires_python, is_prerelease,
-            yanked, yank_reason, uploaded_at, summary, description,
-            author, author_email, maintainer, maintainer_email,
-            license, keywords, classifiers, platform, home_page,
-            download_url, requires_dist, provides_dist, obsoletes_dist,
-            requires_external, project_urls
-        """
         row = await self.postgres.fetchrow(
-            query,
+            _SQL_UPDATE_RELEASE,
             release.id,
             release.project_id,
             release.requires_python,
@@ -183,32 +345,18 @@ class PostgresReleaseRepository(ReleaseRepository):
 
     async def delete_release(self, release_id: int) -> bool:
         """Delete a release."""
-        query = """
-        DELETE FROM releases
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, release_id)
-        return "DELETE 1" in result
+        result = await self.postgres.fetchval(_SQL_DELETE_RELEASE, release_id)
+        return result is not None
 
     async def yank_release(self, release_id: int, reason: str | None = None) -> bool:
         """Mark a release as yanked."""
-        query = """
-        UPDATE releases
-        SET yanked = TRUE, yank_reason = $2
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, release_id, reason)
-        return "UPDATE 1" in result
+        result = await self.postgres.fetchval(_SQL_YANK_RELEASE, release_id, reason)
+        return result is not None
 
     async def unyank_release(self, release_id: int) -> bool:
         """Unmark a release as yanked."""
-        query = """
-        UPDATE releases
-        SET yanked = FALSE, yank_reason = NULL
-        WHERE id = $1
-        """
-        result = await self.postgres.execute(query, release_id)
-        return "UPDATE 1" in result
+        result = await self.postgres.fetchval(_SQL_UNYANK_RELEASE, release_id)
+        return result is not None
 
     def _row_to_release(self, row: dict[str, Any] | None) -> Release:
         """Convert a database row to a Release model."""
@@ -218,48 +366,26 @@ class PostgresReleaseRepository(ReleaseRepository):
                 id=0, project_id=0, version="", uploaded_at=datetime.utcnow()
             )
 
-        # Handle JSONB columns that may be returned as strings
-        # Parse JSON strings if needed
-        def parse_json_list(value: Any) -> list[Any]:
-            if isinstance(value, str):
-                try:
-                    result = json.loads(value)
-                except json.JSONDecodeError:
-                    return []
-                else:
-                    if isinstance(result, list):
-                        return result
-                    return []
-            return value or []
-
-        def parse_json_dict(value: Any) -> dict[str, Any]:
-            if isinstance(value, str):
-                try:
-                    result = json.loads(value)
-                except json.JSONDecodeError:
-                    return {}
-                else:
-                    if isinstance(result, dict):
-                        return result
-                    return {}
-            return value or {}
-
-        classifiers = parse_json_list(row.get("classifiers"))
-        requires_dist = parse_json_list(row.get("requires_dist"))
-        provides_dist = parse_json_list(row.get("provides_dist"))
-        obsoletes_dist = parse_json_list(row.get("obsoletes_dist"))
-        requires_external = parse_json_list(row.get("requires_external"))
-        project_urls = parse_json_dict(row.get("project_urls"))
-
-        return Release(
+        # JSONB columns are decoded by the connection codec; NULLs become empty
+        classifiers = row.get("classifiers") or []
+        requires_dist = row.get("requires_dist") or []
+        provides_dist = row.get("provides_dist") or []
+        obsoletes_dist = row.get("obsoletes_dist") or []
+        requires_external = row.get("requires_external") or []
+        project_urls = row.get("project_urls") or {}
+
+        # Column types already match the model, so skip pydantic validation;
+        # this runs once per row on every listing query. Nullable columns
+        # backing non-optional fields fall back to the model default by hand
+        return Release.model_construct(
             id=row["id"],
             project_id=row["project_id"],
             version=row["version"],
             requires_python=row.get("requires_python"),
-            is_prerelease=row.get("is_prerelease", False),
-            yanked=row.get("yanked", False),
+            is_prerelease=row.get("is_prerelease") or False,
+            yanked=row.get("yanked") or False,
             yank_reason=row.get("yank_reason"),
-            uploaded_at=row.get("uploaded_at", datetime.utcnow()),
+            uploaded_at=row.get("uploaded_at") or datetime.utcnow(),
             summary=row.get("summary"),
             description=row.get("description"),
             author=row.get("author"),
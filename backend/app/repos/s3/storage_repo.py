@@ -1,10 +1,15 @@
-import hashlib
+from collections.abc import AsyncIterator
 from typing import Any
 
 from botocore.exceptions import ClientError
 
 from app.core.clients.s3 import S3Client
-from app.repos.interfaces import StorageRepository
+from app.core.hashing import hash_content_async
+from app.repos.interfaces import CacheRepository, StorageRepository
+
+# Seconds a confirmed object is remembered by file_exists. Only hits are
+# cached, so a freshly uploaded object is never reported as missing
+EXISTS_CACHE_TTL = 60
 
 
 class S3StorageFileNotFoundError(FileNotFoundError):
@@ -17,8 +22,9 @@ class S3StorageFileNotFoundError(FileNotFoundError):
 class S3StorageRepository(StorageRepository):
     """S3 implementation of the storage repository."""
 
-    def __init__(self, s3: S3Client):
+    def __init__(self, s3: S3Client, cache: CacheRepository | None = None):
         self.s3 = s3
+        self.cache = cache
 
     async def get_file(self, path: str) -> bytes:
         """Get a file from storage."""
@@ -30,13 +36,39 @@ class S3StorageRepository(StorageRepository):
                 raise S3StorageFileNotFoundError(path) from e
             raise
 
-    async def put_file(self, path: str, content: bytes, content_type: str) -> bool:
+    async def get_file_with_presence(self, path: str) -> bytes | None:
+        """
+        Get a file from storage, or None if it does not exist.
+
+        Use instead of file_exists() followed by get_file(), which costs a
+        HEAD and a GET round trip where this needs only the GET.
+        """
+        try:
+            return await self.get_file(path)
+        except S3StorageFileNotFoundError:
+            return None
+
+    async def stream_file(self, path: str) -> AsyncIterator[bytes]:
+        """Open a file in storage and return an iterator over its content."""
+        bucket = self.s3.config.default_bucket
+        try:
+            return await self.s3.stream_file(bucket, path)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                raise S3StorageFileNotFoundError(path) from e
+            raise
+
+    async def put_file(
+        self,
+        path: str,
+        content: bytes,
+        content_type: str,
+        digests: tuple[str, str] | None = None,
+    ) -> bool:
         """Store a file in storage."""
         bucket = self.s3.config.default_bucket
-        # Calculate hashes for metadata
-        # Use MD5 only for backwards compatibility with S3 ETag, not for security
-        md5_hash = hashlib.md5(content, usedforsecurity=False).hexdigest()
-        sha256_hash = hashlib.sha256(content).hexdigest()
+        # Calculate hashes for metadata, unless the caller already has them
+        md5_hash, sha256_hash = digests or await hash_content_async(content)
 
         # Add metadata to the file
         metadata = {
@@ -67,35 +99,52 @@ class S3StorageRepository(StorageRepository):
         except Exception:
             return False
         else:
+            if self.cache is not None:
+                await self.cache.delete(self._exists_cache_key(bucket, path))
             return True
 
     async def file_exists(self, path: str) -> bool:
         """Check if a file exists in storage."""
         bucket = self.s3.config.default_bucket
-        return await self.s3.object_exists(bucket, path)
+        if self.cache is None:
+            return await self.s3.object_exists(bucket, path)
+
+        cache_key = self._exists_cache_key(bucket, path)
+        if await self.cache.get(cache_key):
+            return True
+
+        exists = await self.s3.object_exists(bucket, path)
+        if exists:
+            await self.cache.set(cache_key, True, expire=EXISTS_CACHE_TTL)
+        return exists
+
+    @staticmethod
+    def _exists_cache_key(bucket: str | None, path: str) -> str:
+        """Build the cache key remembering that an object exists."""
+        return f"s3exists:{bucket}:{path}"
 
     async def get_file_metadata(self, path: str) -> dict[str, Any]:
         """Get metadata for a file in storage."""
         bucket = self.s3.config.default_bucket
         try:
-            async with self.s3._get_client() as client:
-                response = await client.head_object(Bucket=bucket, Key=path)
-
-                # Extract metadata
-                result = {
-                    "size": response.get("ContentLength", 0),
-                    "last_modified": response.get("LastModified"),
-                    "content_type": response.get("ContentType"),
-                    "etag": response.get("ETag", "").strip('"'),
-                }
-
-                # Add any custom metadata
-                if "Metadata" in response:
-                    for key, value in response["Metadata"].items():
-                        result[key] = value
-
-                return result
+            response = await self.s3.head_object(bucket, path)
         except ClientError as e:
-            if e.response["Error"]["Code"] == "404":
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status == 404:
                 raise S3StorageFileNotFoundError(path) from e
             raise
+
+        # Extract metadata
+        result = {
+            "size": response.get("ContentLength", 0),
+            "last_modified": response.get("LastModified"),
+            "content_type": response.get("ContentType"),
+            "etag": response.get("ETag", "").strip('"'),
+        }
+
+        # Add any custom metadata
+        if "Metadata" in response:
+            for key, value in response["Metadata"].items():
+                result[key] = value
+
+        return result
@@ -1,7 +1,9 @@
-import json
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
+import orjson
+
 from app.core.clients.valkey import ValkeyClient
 from app.repos.interfaces import CacheRepository
 
@@ -10,6 +12,9 @@ logger = logging.getLogger(__name__)
 # Error messages
 VALKEY_CLIENT_NOT_INITIALIZED = "ValKey client is not initialized"
 
+# Keys requested per SCAN round trip when clearing the cache
+SCAN_BATCH_SIZE = 1000
+
 
 class ValkeyCacheRepository(CacheRepository):
     """Valkey implementation of the cache repository."""
@@ -25,12 +30,9 @@ class ValkeyCacheRepository(CacheRepository):
         if data is None:
             return None
         try:
-            # Convert to string if bytes
-            string_data = data.decode("utf-8") if isinstance(data, bytes) else data
-
-            # First try to deserialize as JSON (for simple types)
-            return json.loads(string_data)
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # orjson parses the raw bytes directly, without an intermediate str
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
             # Log and return None for invalid JSON
             logger.warning(f"Failed to deserialize data as JSON: {e}")
             return None
@@ -43,10 +45,12 @@ class ValkeyCacheRepository(CacheRepository):
         """Set a value in cache."""
         full_key = f"{self.prefix}{key}"
 
-        # Try to serialize as JSON (more efficient, portable, and secure)
+        # Try to serialize as JSON (more efficient, portable, and secure).
+        # orjson writes bytes and natively handles datetimes, so model dumps
+        # with timestamps are cached as JSON rather than as their str() form
         try:
-            data = json.dumps(value)
-        except (TypeError, json.JSONDecodeError):
+            data: str | bytes = orjson.dumps(value)
+        except TypeError:
             # For non-JSON serializable objects, convert to string
             # This is safer than using pickle which can execute arbitrary code
             logger.warning("Object is not JSON serializable, storing as string")
@@ -55,6 +59,26 @@ class ValkeyCacheRepository(CacheRepository):
         # Set in cache with optional expiration
         return await self.valkey.set(full_key, data, ex=expire)
 
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Get a value from cache as the raw bytes it was stored as."""
+        return await self.valkey.get(f"{self.prefix}{key}")
+
+    async def get_bytes_many(self, keys: list[str]) -> list[bytes | None]:
+        """Get several raw values in one round trip, None for missing keys."""
+        return await self.valkey.mget_many([f"{self.prefix}{key}" for key in keys])
+
+    async def set_bytes(
+        self, key: str, value: bytes, expire: int | None = None
+    ) -> bool:
+        """Set a value in cache from already serialized bytes."""
+        return await self.valkey.set(f"{self.prefix}{key}", value, ex=expire)
+
+    async def set_bytes_many(self, items: list[tuple[str, bytes, int | None]]) -> bool:
+        """Set several (key, bytes, expire) entries in one round trip."""
+        return await self.valkey.set_many(
+            [(f"{self.prefix}{key}", value, expire) for key, value, expire in items]
+        )
+
     async def delete(self, key: str) -> bool:
         """Delete a value from cache."""
         full_key = f"{self.prefix}{key}"
@@ -69,29 +93,32 @@ class ValkeyCacheRepository(CacheRepository):
 
     async def clear(self) -> bool:
         """Clear all values with our prefix from cache."""
-        # This is a potentially expensive operation - use with caution
-        keys = await self._scan_keys(f"{self.prefix}*")
-        if not keys:
+        # This is a potentially expensive operation - use with caution.
+        # Each SCAN page is unlinked as it arrives, so the full key list is
+        # never held in memory and the server frees values off its main thread
+        matched = 0
+        unlinked = 0
+        async for keys in self._scan_batches(f"{self.prefix}*"):
+            matched += len(keys)
+            unlinked += await self.valkey.unlink(*keys)
+
+        if not matched:
             return True
+        return unlinked > 0
 
-        result = await self.valkey.delete(*keys)
-        return result > 0
-
-    async def _scan_keys(self, pattern: str) -> list[str]:
-        """Scan for keys matching a pattern."""
+    async def _scan_batches(self, pattern: str) -> AsyncIterator[list[str]]:
+        """Scan for keys matching a pattern, yielding each non-empty page."""
         cursor = 0
-        keys = []
 
         while True:
             if self.valkey._client is None:
                 raise ValueError(VALKEY_CLIENT_NOT_INITIALIZED)
 
             cursor, matched_keys = await self.valkey._client.scan(
-                cursor=cursor, match=pattern, count=100
+                cursor=cursor, match=pattern, count=SCAN_BATCH_SIZE
             )
-            keys.extend(matched_keys)
+            if matched_keys:
+                yield matched_keys
 
             if cursor == 0:  # No more keys
                 break
-
-        return keys
@@ -1,26 +1,227 @@
+import asyncio
 import base64
 import contextlib
 import hashlib
-import json
+import hmac
 import logging
-import os
-import uuid
+import re
+import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Any
 
 import httpx
-import jwt
+import orjson
+from cachetools import TLRUCache, TTLCache
 
+from app.core.caching import jittered_ttl
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Error messages
+JWT_KEY_NOT_CONFIGURED = "JWT secret key is not configured"
+
 # JWT settings
 JWT_SECRET_KEY = settings.auth.jwt_secret_key
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_DELTA = timedelta(minutes=settings.auth.token_expire_minutes)
 
+# Access tokens are always HS256 with the same header, so its encoded segment
+# and the key bytes are prepared once rather than on every token
+_JWT_KEY = JWT_SECRET_KEY.encode() if JWT_SECRET_KEY else b""
+_JWT_HEADER_SEGMENT = (
+    b"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."  # {"alg":"HS256","typ":"JWT"}
+)
+
+# Stored API key hash formats (api_keys.hash_version)
+API_KEY_HASH_PBKDF2 = 1
+API_KEY_HASH_BLAKE2B = 2
+
+# BLAKE2b accepts keys up to 64 bytes, so the configured pepper is condensed
+_API_KEY_PEPPER = (
+    hashlib.blake2b(settings.auth.api_key_pepper.encode()).digest()
+    if settings.auth.api_key_pepper
+    else b""
+)
+
+# Shared HTTP client settings for OAuth provider calls; keep-alive connections
+# are reused so each verification doesn't pay for a new TLS handshake
+OAUTH_HTTP_TIMEOUT = 5.0
+OAUTH_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+# Shape of keys issued by create_api_key: "sol", an id part without "_", and a
+# base64url random part. Keys starting with "sol_" that don't match are
+# rejected without a lookup, as are inputs longer than any key ever issued
+_API_KEY_RE = re.compile(r"sol_[A-Za-z0-9-]{8,}_[A-Za-z0-9_-]{32,}")
+API_KEY_MAX_LENGTH = 256
+
+# Hex characters of the id part stored as the public key_id. Keys issued
+# before it was lengthened carry an 8-character key_id; key_ids are not
+# unique, so every row sharing one is checked against the key's hash
+API_KEY_ID_LENGTH = 16
+LEGACY_API_KEY_ID_LENGTH = 8
+
+# Seconds to collect API key last_used_at updates before writing them as one batch
+API_KEY_TOUCH_INTERVAL = 1.0
+
+# Provider profiles fetched for an OAuth token are reused for this many seconds,
+# so a burst of requests carrying the same token makes one provider call
+OAUTH_USER_CACHE_SIZE = 5000
+OAUTH_USER_CACHE_TTL = 60
+
+# In-process cache of verified API keys, consulted before Valkey and Postgres.
+# Entries are short-lived since revoking a key only clears this worker's copy
+API_KEY_LOCAL_CACHE_SIZE = 10_000
+API_KEY_LOCAL_CACHE_TTL = 30
+
+# Cached in place of a user id with no user, so repeated lookups of an unknown
+# id are answered without querying the database. No user dict has this key
+_USER_MISS = {"__miss__": True}
+USER_MISS_CACHE_TTL = 10
+
+# Queries are module constants so every call sends the same text, which is
+# what asyncpg's per-connection statement cache keys prepared statements on
+_SQL_GET_USER_BY_ID = """
+SELECT
+    id, username, email, scopes,
+    created_at, updated_at, oauth_provider
+FROM users
+WHERE id = $1
+"""
+
+_SQL_GET_USER_BY_PROVIDER = """
+SELECT
+    id, username, email, scopes,
+    created_at, updated_at, oauth_provider
+FROM users
+WHERE provider_id = $1 AND oauth_provider = $2
+"""
+
+# Inserts a new user or refreshes a returning user's email and username in one
+# round trip. The conditional DO UPDATE leaves unchanged rows unwritten, and
+# returns nothing for them, so the existing row is selected in that case
+_SQL_UPSERT_USER = """
+WITH upserted AS (
+    INSERT INTO users (
+        provider_id, oauth_provider, username,
+        email, name, scopes, created_at, updated_at
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, NOW(), NOW()
+    )
+    ON CONFLICT (provider_id, oauth_provider) DO UPDATE
+    SET email = EXCLUDED.email,
+        username = EXCLUDED.username,
+        updated_at = NOW()
+    WHERE users.email <> EXCLUDED.email
+       OR users.username <> EXCLUDED.username
+    RETURNING id, username, email, scopes,
+              created_at, updated_at, oauth_provider
+)
+SELECT * FROM upserted
+UNION ALL
+SELECT
+    id, username, email, scopes,
+    created_at, updated_at, oauth_provider
+FROM users
+WHERE provider_id = $1 AND oauth_provider = $2
+  AND NOT EXISTS (SELECT 1 FROM upserted)
+"""
+
+_SQL_GET_API_KEY_BY_DESCRIPTION = """
+SELECT id FROM api_keys
+WHERE user_id = $1 AND description = $2
+"""
+
+_SQL_CREATE_API_KEY = """
+INSERT INTO api_keys (
+    key_id, key_hash, hash_version, user_id, scopes,
+    expires_at, description, last_used_at
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+RETURNING id, key_id, scopes, created_at, expires_at, description
+"""
+
+# Test-mode and legacy keys are stored verbatim and looked up directly
+_SQL_GET_LEGACY_API_KEY = """
+SELECT
+    k.id, k.key, k.user_id, k.scopes, k.expires_at,
+    u.username, u.email
+FROM api_keys k
+JOIN users u ON k.user_id = u.id
+WHERE k.key = $1 AND k.expires_at > NOW() AND k.revoked IS NOT TRUE
+"""
+
+_SQL_GET_API_KEY = """
+SELECT
+    k.id, k.key_id, k.key_hash, k.key_salt, k.hash_version,
+    k.user_id, k.scopes, k.expires_at, k.description,
+    u.username, u.email
+FROM api_keys k
+JOIN users u ON k.user_id = u.id
+WHERE k.key_id = ANY($1::text[]) AND k.expires_at > NOW() AND k.revoked IS NOT TRUE
+"""
+
+_SQL_REHASH_API_KEY = """
+UPDATE api_keys
+SET key_hash = $1, key_salt = NULL, hash_version = $2, updated_at = NOW()
+WHERE id = $3
+"""
+
+_SQL_TOUCH_API_KEYS = """
+UPDATE api_keys
+SET last_used_at = v.used_at
+FROM unnest($1::int[], $2::timestamptz[]) AS v(id, used_at)
+WHERE api_keys.id = v.id
+"""
+
+_SQL_REVOKE_API_KEY = """
+UPDATE api_keys
+SET revoked = TRUE, revoked_at = NOW()
+WHERE id = $1
+RETURNING id, key_id
+"""
+
+
+def _local_api_key_expiry(_cache_key: str, user: dict, now: float) -> float:
+    """Expire a locally cached key after the TTL, or sooner if the key expires."""
+    deadline = now + API_KEY_LOCAL_CACHE_TTL
+    expires_at = user.get("expires_at")
+    # Results served from Valkey carry the expiry as an ISO 8601 string
+    if isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    if isinstance(expires_at, datetime):
+        deadline = min(deadline, now + expires_at.timestamp() - time.time())
+    return deadline
+
+
+def _encode_jwt(claims: dict[str, Any]) -> str:
+    """Sign claims as an HS256 JWT, as jwt.encode would, without its overhead."""
+    if not _JWT_KEY:
+        raise ValueError(JWT_KEY_NOT_CONFIGURED)
+
+    signing_input = _JWT_HEADER_SEGMENT + _b64url(orjson.dumps(claims))
+    signature = hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode()
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWT segments are."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _hash_api_key(api_key: bytes) -> bytes:
+    """
+    Hash an API key for storage with a single keyed BLAKE2b pass.
+
+    Generated keys keep 256 bits of randomness secret (the 192-bit random
+    part plus the 64 bits of the id part not exposed as key_id), so key
+    stretching such as PBKDF2 adds no protection; a fast hash keeps
+    verification sub-microsecond.
+    """
+    return hashlib.blake2b(api_key, key=_API_KEY_PEPPER, digest_size=32).digest()
+
 
 class AuthService:
     """
@@ -34,6 +235,24 @@ class AuthService:
         """Initialize the auth service with database and cache clients."""
         self.postgres = postgres_client
         self.cache = cache_repo
+        self._http = httpx.AsyncClient(
+            timeout=OAUTH_HTTP_TIMEOUT, limits=OAUTH_HTTP_LIMITS
+        )
+        # last_used_at updates waiting to be written, keyed by API key id
+        self._pending_touches: dict[int, datetime] = {}
+        self._touch_task: asyncio.Task[None] | None = None
+        # Provider profiles keyed by (provider, token digest)
+        self._provider_users: TTLCache[tuple[str, bytes], dict] = TTLCache(
+            maxsize=OAUTH_USER_CACHE_SIZE, ttl=OAUTH_USER_CACHE_TTL
+        )
+        # Verified API key results keyed by their derived cache key
+        self._verified_keys: TLRUCache[str, dict] = TLRUCache(
+            maxsize=API_KEY_LOCAL_CACHE_SIZE, ttu=_local_api_key_expiry
+        )
+        # In-flight user lookups keyed by user id, shared by concurrent cache misses
+        self._user_loads: dict[str, asyncio.Task[dict | None]] = {}
+        # In-flight provider profile fetches, keyed like _provider_users
+        self._provider_loads: dict[tuple[str, bytes], asyncio.Task[dict | None]] = {}
 
     async def create_access_token(
         self, data: dict, expires_delta: timedelta | None = None
@@ -49,24 +268,20 @@ class AuthService:
             Encoded JWT token
 
         """
-        from app.api.dependencies.auth import JWT_ALGORITHM, JWT_SECRET_KEY
-
-        to_encode = data.copy()
-
-        # Use provided expiration or default from settings
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            from app.api.dependencies.auth import JWT_EXPIRATION_DELTA
-
-            expire = datetime.utcnow() + JWT_EXPIRATION_DELTA
-
-        to_encode.update({"exp": expire})
-
-        # Add issued at time for security
-        to_encode.update({"iat": datetime.utcnow()})
+        # Take the clock once so exp and iat are derived from the same instant.
+        # Claims are int epoch seconds (JWT NumericDate), which PyJWT would
+        # otherwise derive from datetimes on every encode
+        now = int(time.time())
+        lifetime = expires_delta or JWT_EXPIRATION_DELTA
+
+        # Use provided expiration or default from settings; iat is added for security
+        to_encode = {
+            **data,
+            "exp": now + int(lifetime.total_seconds()),
+            "iat": now,
+        }
 
-        return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+        return _encode_jwt(to_encode)
 
     async def get_user_by_id(self, user_id: str) -> dict | None:
         """
@@ -82,36 +297,49 @@ class AuthService:
         # Try cache first
         if self.cache:
             cached_user = await self.cache.get(f"user:{user_id}")
+            if cached_user == _USER_MISS:
+                return None
             if cached_user:
                 return cached_user
 
+        # Concurrent misses for the same user wait on one lookup instead of
+        # each querying the database. The shield keeps a cancelled caller from
+        # cancelling the lookup the other callers are waiting on
+        load = self._user_loads.get(user_id)
+        if load is None:
+            load = asyncio.create_task(self._load_user(user_id))
+            self._user_loads[user_id] = load
+            load.add_done_callback(lambda _: self._user_loads.pop(user_id, None))
+        return await asyncio.shield(load)
+
+    async def _load_user(self, user_id: str) -> dict | None:
+        """Load a user from the database and cache the result."""
         # Query database
-        query = """
-        SELECT
-            id, username, email, scopes,
-            created_at, updated_at, oauth_provider
-        FROM users
-        WHERE id = $1
-        """
-        user_row = await self.postgres.fetchrow(query, user_id)
+        user_row = await self.postgres.fetchrow(_SQL_GET_USER_BY_ID, user_id)
 
         if not user_row:
+            if self.cache:
+                await self.cache.set(
+                    f"user:{user_id}", _USER_MISS, expire=USER_MISS_CACHE_TTL
+                )
             return None
 
-        # Convert to dict
+        # Convert to dict. Timestamps stay datetimes: the cache's orjson
+        # encoder writes them as ISO 8601 natively, as does the JSON response
         user = {
             "user_id": user_row["id"],
             "username": user_row["username"],
             "email": user_row["email"],
             "scopes": user_row["scopes"],
-            "created_at": user_row["created_at"].isoformat(),
-            "updated_at": user_row["updated_at"].isoformat(),
+            "created_at": user_row["created_at"],
+            "updated_at": user_row["updated_at"],
             "oauth_provider": user_row["oauth_provider"],
         }
 
         # Cache the result
         if self.cache:
-            await self.cache.set(f"user:{user_id}", user, expire=300)  # 5 minutes
+            # Cache for about 5 minutes
+            await self.cache.set(f"user:{user_id}", user, expire=jittered_ttl(300))
 
         return user
 
@@ -166,70 +394,45 @@ class AuthService:
 
         """
         # Generate a unique API key with more entropy
-        # Format: prefix_base64(uuid4)_base64(32 random bytes)
+        # Format: prefix_hex(16 random bytes)_base64url(24 random bytes)
+        # The id part is hex so it never contains the "_" separator; the
+        # random part may, which verify_api_key allows for
         key_prefix = "sol"
-        uuid_part = (
-            base64.urlsafe_b64encode(uuid.uuid4().bytes).decode("ascii").rstrip("=")
-        )
-        random_part = (
-            base64.urlsafe_b64encode(os.urandom(32)).decode("ascii").rstrip("=")
-        )
-        api_key = f"{key_prefix}_{uuid_part}_{random_part}"
+        id_part = secrets.token_hex(16)
+        random_part = secrets.token_urlsafe(24)
+        api_key = f"{key_prefix}_{id_part}_{random_part}"
 
-        # Generate a key ID (first 8 chars of uuid)
-        key_id = uuid_part[:8]
+        # Generate a key ID (first 64 bits of the id part)
+        key_id = id_part[:API_KEY_ID_LENGTH]
 
         # Hash the API key for storage
-        # Use a strong hashing algorithm with salt
-        salt = os.urandom(16)
-        key_hash = hashlib.pbkdf2_hmac(
-            "sha256",
-            api_key.encode(),
-            salt,
-            100000,  # Use 100,000 iterations for PBKDF2
-        )
-
-        # Store the salt and hash separately
-        salt_hex = salt.hex()
-        key_hash_hex = key_hash.hex()
+        key_hash_hex = _hash_api_key(api_key.encode()).hex()
 
         # Set expiry
         if expires_in_days is None:
             expires_in_days = settings.auth.api_key_expiry_days
 
-        expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(days=expires_in_days)
 
         # Check if the API key already exists (by user_id and description)
         if description:
-            existing_query = """
-            SELECT id FROM api_keys
-            WHERE user_id = $1 AND description = $2
-            """
-            existing = await self.postgres.fetchrow(
-                existing_query, user_id, description
+            existing_id = await self.postgres.fetchval(
+                _SQL_GET_API_KEY_BY_DESCRIPTION, user_id, description
             )
 
-            if existing:
+            if existing_id is not None:
                 # Revoke the existing key first
-                await self.revoke_api_key(existing["id"])
+                await self.revoke_api_key(existing_id)
 
         # Store in database - don't store the actual key, only its hash
-        query = """
-        INSERT INTO api_keys (
-            key_id, key_hash, key_salt, user_id, scopes,
-            expires_at, description, last_used_at
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        RETURNING id, key_id, scopes, created_at, expires_at, description
-        """
-        now = datetime.utcnow()
         row = await self.postgres.fetchrow(
-            query,
+            _SQL_CREATE_API_KEY,
             key_id,
             key_hash_hex,
-            salt_hex,
+            API_KEY_HASH_BLAKE2B,
             user_id,
-            json.dumps(scopes),
+            scopes,
             expires_at,
             description,
             now,
@@ -241,7 +444,7 @@ class AuthService:
             "id": row["id"],
             "key": api_key,  # Only returned once at creation
             "key_id": row["key_id"],  # Public identifier of the key
-            "scopes": json.loads(row["scopes"]),
+            "scopes": row["scopes"],
             "created_at": row["created_at"].isoformat(),
             "expires_at": row["expires_at"].isoformat(),
             "description": row["description"] if row["description"] else None,
@@ -262,15 +465,7 @@ class AuthService:
         if settings.server.environment == "development" and api_key == "testpassword":
             # Special case for test environment - directly query the database for this key
             logger.info("Using test mode API key authentication")
-            query = """
-            SELECT
-                k.id, k.key, k.user_id, k.scopes, k.expires_at,
-                u.username, u.email
-            FROM api_keys k
-            JOIN users u ON k.user_id = u.id
-            WHERE k.key = $1 AND k.expires_at > $2
-            """
-            row = await self.postgres.fetchrow(query, api_key, datetime.utcnow())
+            row = await self.postgres.fetchrow(_SQL_GET_LEGACY_API_KEY, api_key)
 
             if row:
                 # Build user info
@@ -278,32 +473,26 @@ class AuthService:
                     "user_id": row["user_id"],
                     "username": row["username"],
                     "email": row["email"],
-                    "scopes": json.loads(row["scopes"]),
+                    "scopes": row["scopes"],
                     "api_key_id": row["id"],
                     "key_id": "test",  # Placeholder for test key
-                    "expires_at": row["expires_at"].isoformat()
-                    if row["expires_at"]
-                    else None,
+                    "expires_at": row["expires_at"],
                 }
 
         # Regular API key validation for production keys
         # Check if the API key has the correct format
         if not api_key or not isinstance(api_key, str):
             return None
+        if len(api_key) > API_KEY_MAX_LENGTH:
+            return None
+        if api_key.startswith("sol_") and not _API_KEY_RE.fullmatch(api_key):
+            return None
 
-        # Validate key format: prefix_uuid_random
-        parts = api_key.split("_")
+        # Validate key format: prefix_id_random (the random part may contain "_")
+        parts = api_key.split("_", 2)
         if len(parts) != 3 or parts[0] != "sol":
             # Try legacy key format (direct key lookup)
-            query = """
-            SELECT
-                k.id, k.key, k.user_id, k.scopes, k.expires_at,
-                u.username, u.email
-            FROM api_keys k
-            JOIN users u ON k.user_id = u.id
-            WHERE k.key = $1 AND k.expires_at > $2
-            """
-            row = await self.postgres.fetchrow(query, api_key, datetime.utcnow())
+            row = await self.postgres.fetchrow(_SQL_GET_LEGACY_API_KEY, api_key)
 
             if row:
                 # Build user info for legacy key
@@ -311,116 +500,171 @@ class AuthService:
                     "user_id": row["user_id"],
                     "username": row["username"],
                     "email": row["email"],
-                    "scopes": json.loads(row["scopes"]),
+                    "scopes": row["scopes"],
                     "api_key_id": row["id"],
-                    "expires_at": row["expires_at"].isoformat()
-                    if row["expires_at"]
-                    else None,
+                    "expires_at": row["expires_at"],
                 }
             return None
 
-        # Extract the key ID from the UUID part
-        try:
-            key_id = parts[1][:8]  # First 8 chars of the uuid part
-        except (IndexError, AttributeError):
-            return None
+        # Candidate key IDs from the id part, current and legacy length
+        key_ids = list(
+            dict.fromkeys(
+                (parts[1][:API_KEY_ID_LENGTH], parts[1][:LEGACY_API_KEY_ID_LENGTH])
+            )
+        )
 
-        # Try cache first with a derived cache key (not the actual API key)
-        cache_key = f"api_key_hash:{hashlib.sha256(api_key.encode()).hexdigest()}"
-        if self.cache:
+        # Encoded once and shared by the cache key and hash computations below
+        api_key_bytes = api_key.encode()
+
+        # Try cache first with a derived cache key (not the actual API key),
+        # checking this process before making a round trip to Valkey
+        cache_key = f"api_key_hash:{hashlib.sha256(api_key_bytes).hexdigest()}"
+        cached_result = self._verified_keys.get(cache_key)
+        if cached_result is None and self.cache:
             cached_result = await self.cache.get(cache_key)
             if cached_result:
-                # Update last used time asynchronously
-                update_query = """
-                UPDATE api_keys
-                SET last_used_at = $1
-                WHERE id = $2
-                """
-                try:
-                    await self.postgres.execute(
-                        update_query, datetime.utcnow(), cached_result.get("api_key_id")
-                    )
-                except Exception:
-                    # Non-critical error, just log it
-                    logger.warning(
-                        f"Failed to update last_used_at for API key: {key_id}"
-                    )
-
-                return cached_result
-
-        # Get API key record by key_id
-        query = """
-        SELECT
-            k.id, k.key_id, k.key_hash, k.key_salt,
-            k.user_id, k.scopes, k.expires_at, k.description,
-            u.username, u.email
-        FROM api_keys k
-        JOIN users u ON k.user_id = u.id
-        WHERE k.key_id = $1 AND k.expires_at > $2
-        """
-        now = datetime.utcnow()
-        row = await self.postgres.fetchrow(query, key_id, now)
+                self._verified_keys[cache_key] = cached_result
+        if cached_result:
+            # Update last used time asynchronously
+            self._touch_api_key(cached_result.get("api_key_id"), datetime.utcnow())
+            return cached_result
+
+        # Get the API key records by key_id; as key_ids can collide, the key
+        # belongs to whichever of them its hash matches
+        row = None
+        for candidate in await self.postgres.fetch(_SQL_GET_API_KEY, key_ids):
+            if await self._api_key_matches(candidate, api_key_bytes):
+                row = candidate
+                break
 
         if not row:
             return None
 
-        # Check if we have the new format with hash
-        if row.get("key_hash") and row.get("key_salt"):
-            # Verify the key hash
-            try:
-                # Get the stored hash and salt
-                stored_hash = bytes.fromhex(row["key_hash"])
-                salt = bytes.fromhex(row["key_salt"])
+        # Upgrade a PBKDF2 hash now that the key is known to match it
+        if (
+            row.get("key_hash")
+            and row.get("key_salt")
+            and row.get("hash_version") != API_KEY_HASH_BLAKE2B
+        ):
+            await self._rehash_api_key(row["id"], api_key_bytes)
 
-                # Calculate hash from provided key
-                key_hash = hashlib.pbkdf2_hmac(
-                    "sha256",
-                    api_key.encode(),
-                    salt,
-                    100000,  # Same iteration count as when creating
-                )
-
-                # Compare in constant time to prevent timing attacks
-                import hmac
-
-                if not hmac.compare_digest(key_hash, stored_hash):
-                    return None
-            except Exception:
-                logger.exception("Error verifying API key")
-                return None
-
-        # Update last used time
-        update_query = """
-        UPDATE api_keys
-        SET last_used_at = $1
-        WHERE id = $2
-        """
-        try:
-            await self.postgres.execute(update_query, now, row["id"])
-        except Exception as e:
-            # Non-critical error, just log it
-            logger.warning(f"Failed to update last_used_at for API key: {e}")
+        # Update last used time asynchronously
+        self._touch_api_key(row["id"], datetime.utcnow())
 
         # Build user info
         user = {
             "user_id": row["user_id"],
             "username": row["username"],
             "email": row["email"],
-            "scopes": json.loads(row["scopes"]),
+            "scopes": row["scopes"],
             "api_key_id": row["id"],
             "key_id": row.get(
                 "key_id", "legacy"
             ),  # Include the public key ID or mark as legacy
-            "expires_at": row["expires_at"].isoformat() if row["expires_at"] else None,
+            "expires_at": row["expires_at"],
         }
 
         # Cache result
+        self._verified_keys[cache_key] = user
         if self.cache:
-            # Cache for 5 minutes
-            await self.cache.set(cache_key, user, expire=300)
+            # Cache for about 5 minutes
+            ttl = jittered_ttl(300)
+            await self.cache.set(cache_key, user, expire=ttl)
+            # Index the derived cache key by key id so revoking can find it;
+            # it lives exactly as long as the entry it points to
+            await self.cache.set(f"api_key_idx:{row['id']}", cache_key, expire=ttl)
 
         return user
 
+    @staticmethod
+    async def _api_key_matches(row: Any, api_key: bytes) -> bool:
+        """Check an API key against the hash stored in its record."""
+        # Check if we have the new format with hash
+        is_blake2b = row.get("hash_version") == API_KEY_HASH_BLAKE2B
+        if not (row.get("key_hash") and (is_blake2b or row.get("key_salt"))):
+            return True
+
+        # Verify the key hash
+        try:
+            stored_hash = bytes.fromhex(row["key_hash"])
+
+            if is_blake2b:
+                key_hash = _hash_api_key(api_key)
+            else:
+                # Older keys were stored with salted PBKDF2; compute it off
+                # the event loop, as it is deliberately slow CPU work
+                salt = bytes.fromhex(row["key_salt"])
+                key_hash = await asyncio.to_thread(
+                    hashlib.pbkdf2_hmac,
+                    "sha256",
+                    api_key,
+                    salt,
+                    100000,  # Same iteration count as when creating
+                )
+        except Exception:
+            logger.exception("Error verifying API key")
+            return False
+
+        # Compare in constant time to prevent timing attacks
+        return hmac.compare_digest(key_hash, stored_hash)
+
+    async def _rehash_api_key(self, api_key_id: int, api_key: bytes) -> None:
+        """Upgrade a verified PBKDF2 key hash to keyed BLAKE2b."""
+        try:
+            await self.postgres.execute(
+                _SQL_REHASH_API_KEY,
+                _hash_api_key(api_key).hex(),
+                API_KEY_HASH_BLAKE2B,
+                api_key_id,
+            )
+        except Exception as e:
+            # Non-critical error; the PBKDF2 hash still verifies next time
+            logger.warning(f"Failed to upgrade hash for API key: {e}")
+
+    def _touch_api_key(self, api_key_id: int | None, used_at: datetime) -> None:
+        """
+        Record that an API key was used, without waiting on the database.
+
+        Uses are collected for API_KEY_TOUCH_INTERVAL seconds and then written
+        in a single UPDATE, keeping the write off the request path and
+        collapsing repeated uses of the same key into one row update.
+        """
+        if api_key_id is None:
+            return
+
+        self._pending_touches[api_key_id] = used_at
+        if self._touch_task is None or self._touch_task.done():
+            self._touch_task = asyncio.create_task(self._flush_touches_later())
+
+    async def _flush_touches_later(self) -> None:
+        """Wait for the batching interval, then write pending key uses."""
+        await asyncio.sleep(API_KEY_TOUCH_INTERVAL)
+        await self.flush_api_key_touches()
+
+    async def flush_api_key_touches(self) -> None:
+        """Write all pending API key last_used_at updates in one statement."""
+        pending, self._pending_touches = self._pending_touches, {}
+        if not pending:
+            return
+
+        try:
+            await self.postgres.execute(
+                _SQL_TOUCH_API_KEYS, list(pending), list(pending.values())
+            )
+        except Exception as e:
+            # Non-critical error, just log it
+            logger.warning(f"Failed to update last_used_at for API keys: {e}")
+
+    async def close(self) -> None:
+        """Write any pending API key uses and close the OAuth HTTP client."""
+        if self._touch_task is not None:
+            self._touch_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._touch_task
+            self._touch_task = None
+        await self.flush_api_key_touches()
+        await self._http.aclose()
+
     async def revoke_api_key(self, key_id: int) -> bool:
         """
         Revoke an API key.
@@ -431,25 +675,21 @@ class AuthService:
         Returns:
             True if key was revoked, False otherwise
         """
-        query = """
-        UPDATE api_keys
-        SET revoked = TRUE, revoked_at = $1
-        WHERE id = $2
-        RETURNING id, key_id
-        """
-
         try:
-            row = await self.postgres.fetchrow(query, datetime.utcnow(), key_id)
-
-            # Clear cache entries for this key
-            if self.cache and row and row.get("key_id"):
-                # We don't know the exact cache key since it's derived from the full API key
-                # which we don't store. The best we can do is invalidate potential cache keys
-                # by pattern if the cache backend supports it.
-                # Use contextlib.suppress to handle the case where pattern deletion isn't supported
-                with contextlib.suppress(Exception):
-                    await self.cache.delete("api_key_hash:*")
-                    logger.debug("Cleared API key cache entries with pattern deletion")
+            row = await self.postgres.fetchrow(_SQL_REVOKE_API_KEY, key_id)
+
+            if row:
+                self._forget_verified_key(key_id)
+
+            # Clear the cached verification for this key. Its cache key is
+            # derived from the full API key, which isn't stored, so it is
+            # found through the index written by verify_api_key
+            if self.cache and row:
+                index_key = f"api_key_idx:{key_id}"
+                cache_key = await self.cache.get(index_key)
+                if cache_key:
+                    await self.cache.delete(cache_key)
+                await self.cache.delete(index_key)
 
         except Exception:
             logger.exception("Failed to revoke API key")
@@ -457,6 +697,13 @@ class AuthService:
         else:
             return row is not None
 
+    def _forget_verified_key(self, api_key_id: int) -> None:
+        """Drop a key from the in-process verification cache."""
+        # Revocation is rare, so a scan beats maintaining a reverse index
+        for cache_key, user in list(self._verified_keys.items()):
+            if user.get("api_key_id") == api_key_id:
+                self._verified_keys.pop(cache_key, None)
+
     async def _get_user_from_provider(self, token: str, provider: str) -> dict | None:
         """
         Get user information from OAuth provider.
@@ -469,13 +716,34 @@ class AuthService:
             User data from provider or None if invalid
 
         """
+        # Keyed by a digest so raw tokens aren't kept in memory
+        cache_key = (provider, hashlib.blake2b(token.encode(), digest_size=16).digest())
+        cached_user = self._provider_users.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+
+        # Concurrent requests presenting the same token share one provider call
+        load = self._provider_loads.get(cache_key)
+        if load is None:
+            load = asyncio.create_task(self._fetch_provider_user(token, provider))
+            self._provider_loads[cache_key] = load
+            load.add_done_callback(lambda _: self._provider_loads.pop(cache_key, None))
+        user_data = await asyncio.shield(load)
+
+        # Only successful lookups are cached, so a rejected token is retried
+        if user_data is not None:
+            self._provider_users[cache_key] = user_data
+        return user_data
+
+    async def _fetch_provider_user(self, token: str, provider: str) -> dict | None:
+        """Fetch a user's profile from their OAuth provider."""
         try:
             if provider == "github":
-                return await self._get_github_user(token)
+                user_data = await self._get_github_user(token)
             elif provider == "google":
-                return await self._get_google_user(token)
+                user_data = await self._get_google_user(token)
             elif provider == "microsoft":
-                return await self._get_microsoft_user(token)
+                user_data = await self._get_microsoft_user(token)
             else:
                 logger.error(f"Unsupported OAuth provider: {provider}")
                 return None
@@ -484,90 +752,83 @@ class AuthService:
             logger.exception(f"Error getting user from provider {provider}")
             return None
 
+        return user_data
+
     async def _get_github_user(self, token: str) -> dict | None:
         """Get user data from GitHub."""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"token {token}"}
-            response = await client.get("https://api.github.com/user", headers=headers)
+        headers = {"Authorization": f"token {token}"}
+        # Fetch the profile and the email list (which might be private)
+        # concurrently rather than one after the other
+        response, emails_response = await asyncio.gather(
+            self._http.get("https://api.github.com/user", headers=headers),
+            self._http.get("https://api.github.com/user/emails", headers=headers),
+        )
 
-            if response.status_code != 200:
-                logger.error(
-                    f"GitHub API error: {response.status_code} {response.text}"
-                )
-                return None
+        if response.status_code != 200:
+            logger.error(f"GitHub API error: {response.status_code} {response.text}")
+            return None
 
-            user_data = response.json()
+        user_data = response.json()
 
-            # Get email (which might be private)
-            emails_response = await client.get(
-                "https://api.github.com/user/emails", headers=headers
-            )
+        primary_email = None
+        if emails_response.status_code == 200:
+            emails = emails_response.json()
+            for email in emails:
+                if email.get("primary", False):
+                    primary_email = email.get("email")
+                    break
 
-            primary_email = None
-            if emails_response.status_code == 200:
-                emails = emails_response.json()
-                for email in emails:
-                    if email.get("primary", False):
-                        primary_email = email.get("email")
-                        break
-
-            return {
-                "provider_id": str(user_data["id"]),
-                "username": user_data["login"],
-                "name": user_data.get("name"),
-                "email": primary_email or user_data.get("email"),
-                "avatar_url": user_data.get("avatar_url"),
-            }
+        return {
+            "provider_id": str(user_data["id"]),
+            "username": user_data["login"],
+            "name": user_data.get("name"),
+            "email": primary_email or user_data.get("email"),
+            "avatar_url": user_data.get("avatar_url"),
+        }
 
     async def _get_google_user(self, token: str) -> dict | None:
         """Get user data from Google."""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {token}"}
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v3/userinfo", headers=headers
-            )
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self._http.get(
+            "https://www.googleapis.com/oauth2/v3/userinfo", headers=headers
+        )
 
-            if response.status_code != 200:
-                logger.error(
-                    f"Google API error: {response.status_code} {response.text}"
-                )
-                return None
+        if response.status_code != 200:
+            logger.error(f"Google API error: {response.status_code} {response.text}")
+            return None
 
-            user_data = response.json()
+        user_data = response.json()
 
-            return {
-                "provider_id": user_data["sub"],
-                "username": user_data.get("name", "").replace(" ", "").lower()
-                or user_data["sub"],
-                "name": user_data.get("name"),
-                "email": user_data.get("email"),
-                "avatar_url": user_data.get("picture"),
-            }
+        return {
+            "provider_id": user_data["sub"],
+            "username": user_data.get("name", "").replace(" ", "").lower()
+            or user_data["sub"],
+            "name": user_data.get("name"),
+            "email": user_data.get("email"),
+            "avatar_url": user_data.get("picture"),
+        }
 
     async def _get_microsoft_user(self, token: str) -> dict | None:
         """Get user data from Microsoft."""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {token}"}
-            response = await client.get(
-                "https://graph.microsoft.com/v1.0/me", headers=headers
-            )
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self._http.get(
+            "https://graph.microsoft.com/v1.0/me", headers=headers
+        )
 
-            if response.status_code != 200:
-                logger.error(
-                    f"Microsoft API error: {response.status_code} {response.text}"
-                )
-                return None
+        if response.status_code != 200:
+            logger.error(f"Microsoft API error: {response.status_code} {response.text}")
+            return None
 
-            user_data = response.json()
+        user_data = response.json()
 
-            return {
-                "provider_id": user_data["id"],
-                "username": user_data.get("userPrincipalName", "").split("@")[0]
-                or user_data["id"],
-                "name": user_data.get("displayName"),
-                "email": user_data.get("mail") or user_data.get("userPrincipalName"),
-                "avatar_url": None,  # Microsoft Graph requires additional permissions for photo
-            }
+        return {
+            "provider_id": user_data["id"],
+            "username": user_data.get("userPrincipalName", "").split("@")[0]
+            or user_data["id"],
+            "name": user_data.get("displayName"),
+            "email": user_data.get("mail") or user_data.get("userPrincipalName"),
+            "avatar_url": None,  # Microsoft Graph requires additional permissions for photo
+        }
 
     async def _find_or_create_user(self, provider_user: dict, provider: str) -> dict:
         """
@@ -581,79 +842,42 @@ class AuthService:
             User data from database
 
         """
-        # Look up user by provider ID and provider
-        query = """
-        SELECT
-            id, username, email, scopes,
-            created_at, updated_at, oauth_provider
-        FROM users
-        WHERE provider_id = $1 AND oauth_provider = $2
-        """
+        # New users get download scope by default
+        scopes = ["download"]
+
+        # Create the user, or update a returning user if their details changed
         user_row = await self.postgres.fetchrow(
-            query, provider_user["provider_id"], provider
+            _SQL_UPSERT_USER,
+            provider_user["provider_id"],
+            provider,
+            provider_user["username"],
+            provider_user["email"],
+            provider_user.get("name"),
+            scopes,
         )
 
-        if user_row:
-            # User exists, update if needed
-            if (
-                user_row["email"] != provider_user["email"]
-                or user_row["username"] != provider_user["username"]
-            ):
-                update_query = """
-                UPDATE users
-                SET email = $3, username = $4, updated_at = $5
-                WHERE provider_id = $1 AND oauth_provider = $2
-                RETURNING id, username, email, scopes,
-                          created_at, updated_at, oauth_provider
-                """
-                user_row = await self.postgres.fetchrow(
-                    update_query,
-                    provider_user["provider_id"],
-                    provider,
-                    provider_user["email"],
-                    provider_user["username"],
-                    datetime.utcnow(),
-                )
-        else:
-            # Create new user
-            insert_query = """
-            INSERT INTO users (
-                provider_id, oauth_provider, username,
-                email, name, scopes, created_at, updated_at
-            ) VALUES (
-                $1, $2, $3, $4, $5, $6, $7, $8
-            )
-            RETURNING id, username, email, scopes,
-                      created_at, updated_at, oauth_provider
-            """
-            # New users get download scope by default
-            scopes = ["download"]
-
+        if user_row is None:
+            # The user was inserted concurrently after this statement's
+            # snapshot was taken; a fresh lookup sees the committed row
             user_row = await self.postgres.fetchrow(
-                insert_query,
-                provider_user["provider_id"],
-                provider,
-                provider_user["username"],
-                provider_user["email"],
-                provider_user.get("name"),
-                json.dumps(scopes),
-                datetime.utcnow(),
-                datetime.utcnow(),
+                _SQL_GET_USER_BY_PROVIDER, provider_user["provider_id"], provider
             )
 
-        # Convert to dict
+        # Convert to dict (timestamps stay datetimes, as in get_user_by_id)
         user = {
             "user_id": user_row["id"],
             "username": user_row["username"],
             "email": user_row["email"],
-            "scopes": json.loads(user_row["scopes"]),
-            "created_at": user_row["created_at"].isoformat(),
-            "updated_at": user_row["updated_at"].isoformat(),
+            "scopes": user_row["scopes"],
+            "created_at": user_row["created_at"],
+            "updated_at": user_row["updated_at"],
             "oauth_provider": user_row["oauth_provider"],
         }
 
         # Cache the result
         if self.cache:
-            await self.cache.set(f"user:{user['user_id']}", user, expire=300)
+            await self.cache.set(
+                f"user:{user['user_id']}", user, expire=jittered_ttl(300)
+            )
 
         return user
@@ -1,11 +1,35 @@
 import hashlib
 import logging
+import re
+import sys
+from collections.abc import AsyncIterator
+from typing import Any
 
+from cachetools import TTLCache
+
+from app.core.caching import jittered_ttl
+from app.core.hashing import hash_content_async
 from app.domain.models import File, Project, Release
 from app.repos.interfaces import CacheRepository, FileRepository, StorageRepository
 
 logger = logging.getLogger(__name__)
 
+# Storage metadata keys that are not copied into X-* response headers
+_RESERVED_METADATA_KEYS: frozenset[str] = frozenset({"content_type", "etag", "size"})
+
+# PEP 427 wheel filename: name-version[-build]-python-abi-platform.whl
+_WHEEL_FILENAME_RE = re.compile(
+    r"^[^-]+-[^-]+(?:-[^-]+)?-(?P<python_tag>[^-]+)-[^-]+-[^-]+\.whl$"
+)
+
+# Seconds a file's content type and download headers are cached
+FILE_META_CACHE_TTL = 60 * 10
+
+# Files up to this size (e.g. .metadata and .asc) are also kept in process, so
+# clients that fetch them repeatedly don't reach storage at all
+SMALL_FILE_CACHE_LIMIT = 64 * 1024
+SMALL_FILE_CACHE_SIZE = 256
+
 
 class InvalidProjectReleaseError(ValueError):
     """Raised when project and release do not have valid IDs."""
@@ -33,6 +57,10 @@ class FileService:
         self.file_repo = file_repo
         self.storage_repo = storage_repo
         self.cache_repo = cache_repo
+        # Recently served small files, keyed by path
+        self._small_files: TTLCache[str, tuple[bytes, str, dict[str, str]]] = TTLCache(
+            maxsize=SMALL_FILE_CACHE_SIZE, ttl=FILE_META_CACHE_TTL
+        )
 
     async def get_file(self, path: str) -> tuple[bytes, str, dict[str, str]]:
         """
@@ -49,63 +77,116 @@ class FileService:
         # This would require a more complex lookup by path which isn't modeled yet
         # For simplicity, we'll just get the file from storage directly
 
-        # Calculate cache key
-        cache_key = f"file_content:{path}"
+        # Try the in-process copy of small files first
+        cached_file = self._small_files.get(path)
+        if cached_file is not None:
+            return cached_file
 
-        # Try to get from cache first
-        cached_content = None
-        if self.cache_repo:
-            cached_content = await self.cache_repo.get(cache_key)
+        # Only the content type and headers are cached; file bodies are read
+        # from storage, which is built to serve them
+        cached_meta = await self._get_cached_file_meta(path)
 
-        # Fetch from storage if not in cache
-        if not cached_content:
-            content = await self.storage_repo.get_file(path)
+        content = await self.storage_repo.get_file(path)
 
+        if cached_meta:
+            content_type, headers = cached_meta
+        else:
             # Get file metadata
             metadata = await self.storage_repo.get_file_metadata(path)
             content_type = metadata.get("content_type", "application/octet-stream")
 
             # Calculate headers
-            headers = {
-                "Content-Disposition": f'attachment; filename="{path.split("/")[-1]}"',
-                "Content-Type": content_type,
-                "Content-Length": str(len(content)),
-                "ETag": metadata.get("etag", hashlib.sha256(content).hexdigest()[:32]),
-            }
-
-            # Add any metadata values as headers
-            for key, value in metadata.items():
-                if key not in ["content_type", "etag", "size"]:
-                    headers[f"X-{key.capitalize()}"] = str(value)
-
-            # Cache small files (< 5MB)
-            if self.cache_repo and len(content) < 5 * 1024 * 1024:
-                await self.cache_repo.set(
-                    cache_key,
-                    {
-                        "content": content,
-                        "content_type": content_type,
-                        "headers": headers,
-                    },
-                    expire=60 * 10,  # Cache for 10 minutes
+            headers = self._file_headers(path, metadata, len(content))
+            if "ETag" not in headers:
+                # Prefer the digest recorded at upload time; only objects
+                # stored without one are hashed, with the cheaper BLAKE2b
+                headers["ETag"] = metadata.get("sha256", "")[:32] or (
+                    hashlib.blake2b(content, digest_size=16).hexdigest()
                 )
 
-            return content, content_type, headers
+            await self._cache_file_meta(path, content_type, headers)
+
+        if len(content) <= SMALL_FILE_CACHE_LIMIT:
+            self._small_files[path] = (content, content_type, headers)
+
+        return content, content_type, headers
+
+    async def get_file_stream(
+        self, path: str
+    ) -> tuple[AsyncIterator[bytes], str, dict[str, str]]:
+        """
+        Open a file in storage for streaming.
+
+        Unlike get_file, the content is never held in memory whole and the
+        headers come from storage metadata alone, so the body isn't hashed.
+
+        Args:
+            path: The path to the file
+
+        Returns:
+            Tuple of (content_iterator, content_type, headers)
+
+        """
+        cached_meta = await self._get_cached_file_meta(path)
+        if cached_meta:
+            content_type, headers = cached_meta
         else:
-            # Use cached content
-            return (
-                cached_content["content"],
-                cached_content["content_type"],
-                cached_content["headers"],
+            metadata = await self.storage_repo.get_file_metadata(path)
+            content_type = metadata.get("content_type", "application/octet-stream")
+            headers = self._file_headers(path, metadata, metadata.get("size", 0))
+            await self._cache_file_meta(path, content_type, headers)
+
+        stream = await self.storage_repo.stream_file(path)
+        return stream, content_type, headers
+
+    async def _get_cached_file_meta(
+        self, path: str
+    ) -> tuple[str, dict[str, str]] | None:
+        """Get a file's cached content type and download headers."""
+        if not self.cache_repo:
+            return None
+        cached = await self.cache_repo.get(f"file_meta:{path}")
+        if not cached:
+            return None
+        return cached["content_type"], cached["headers"]
+
+    async def _cache_file_meta(
+        self, path: str, content_type: str, headers: dict[str, str]
+    ) -> None:
+        """Cache a file's content type and download headers."""
+        if self.cache_repo:
+            await self.cache_repo.set(
+                f"file_meta:{path}",
+                {"content_type": content_type, "headers": headers},
+                expire=jittered_ttl(FILE_META_CACHE_TTL),
             )
 
+    @staticmethod
+    def _file_headers(path: str, metadata: dict[str, Any], size: int) -> dict[str, str]:
+        """Build download headers from storage metadata."""
+        content_type = metadata.get("content_type", "application/octet-stream")
+        headers = {
+            "Content-Disposition": f'attachment; filename="{path.split("/")[-1]}"',
+            "Content-Type": content_type,
+            "Content-Length": str(size),
+        }
+        if metadata.get("etag"):
+            headers["ETag"] = metadata["etag"]
+
+        # Add any metadata values as headers
+        for key, value in metadata.items():
+            if key not in _RESERVED_METADATA_KEYS:
+                headers[f"X-{key.capitalize()}"] = str(value)
+
+        return headers
+
     async def get_file_metadata(self, file_id: int) -> File | None:
         """Get metadata for a file by ID."""
         # Try to get from cache first
         if self.cache_repo:
             cached = await self.cache_repo.get(f"file_metadata:{file_id}")
             if cached:
-                return File.parse_obj(cached)
+                return File.model_validate(cached)
 
         # This needs a more complex implementation based on the actual schema
         # For now, we'll just return None
@@ -142,10 +223,8 @@ class FileService:
 
         path = f"{project.normalized_name}/{release.version}/{filename}"
 
-        # Calculate hashes
-        # Use MD5 only for backwards compatibility, not for security
-        md5_digest = hashlib.md5(content, usedforsecurity=False).hexdigest()
-        sha256_digest = hashlib.sha256(content).hexdigest()
+        # Calculate hashes in one pass over the content; storage reuses them
+        md5_digest, sha256_digest = await hash_content_async(content)
 
         # Determine package type and Python version from filename
         packagetype = "sdist"
@@ -155,12 +234,15 @@ class FileService:
             packagetype = "bdist_wheel"
             # Parse Python version from wheel filename
             # Example: package-1.0-py3-none-any.whl
-            parts = filename.split("-")
-            if len(parts) >= 3:
-                python_version = parts[-3]
+            match = _WHEEL_FILENAME_RE.match(filename)
+            if match:
+                # Few distinct tags exist (py3, cp312, ...), so share one copy
+                python_version = sys.intern(match["python_tag"])
 
         # Upload to storage
-        success = await self.storage_repo.put_file(path, content, content_type)
+        success = await self.storage_repo.put_file(
+            path, content, content_type, digests=(md5_digest, sha256_digest)
+        )
 
         if not success:
             raise FileUploadError(path)
@@ -184,7 +266,9 @@ class FileService:
 
         # Invalidate cache
         if self.cache_repo:
-            await self.cache_repo.delete(f"files:{release.id}")
+            await self.cache_repo.delete(
+                f"files:{project.normalized_name}:{release.version}"
+            )
 
         return created_file
 
@@ -1,6 +1,13 @@
+import asyncio
 import logging
 import re
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from typing import TypeVar
 
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.caching import jittered_ttl
 from app.domain.models import File, Project, Release
 from app.repos.interfaces import (
     CacheRepository,
@@ -11,6 +18,23 @@ from app.repos.interfaces import (
 
 logger = logging.getLogger(__name__)
 
+# Runs of separators that PEP 503 collapses into a single hyphen
+_NORMALIZE_RE = re.compile(r"[-_.]+")
+
+# Cached models are stored as JSON bytes and validated straight from them, so
+# neither direction builds an intermediate list of dicts
+_PROJECT_ADAPTER = TypeAdapter(Project)
+_PROJECTS_ADAPTER = TypeAdapter(list[Project])
+_RELEASES_ADAPTER = TypeAdapter(list[Release])
+_FILES_ADAPTER = TypeAdapter(list[File])
+
+# Cached in place of a project that doesn't exist, so repeated lookups of an
+# unknown name (typos, scanners) are answered without querying the database
+_PROJECT_MISS = b"null"
+PROJECT_MISS_CACHE_TTL = 10
+
+T = TypeVar("T")
+
 
 class ProjectNotFoundError(ValueError):
     """Raised when a project is not found."""
@@ -19,6 +43,7 @@ class ProjectNotFoundError(ValueError):
         super().__init__(f"Project not found: {project_name}")
 
 
+@lru_cache(maxsize=4096)
 def normalize_name(name: str) -> str:
     """
     Normalize a package name according to PEP 503.
@@ -38,7 +63,7 @@ def normalize_name(name: str) -> str:
     This exact implementation is critical for compatibility with pip and other
     tools that follow the same normalization rules when looking up packages.
     """
-    return re.sub(r"[-_.]+", "-", name.lower())
+    return _NORMALIZE_RE.sub("-", name.lower())
 
 
 class ProjectService:
@@ -55,6 +80,9 @@ class ProjectService:
         self.release_repo = release_repo
         self.file_repo = file_repo
         self.cache_repo = cache_repo
+        # In-flight project loads keyed by normalized name, shared by
+        # concurrent cache misses
+        self._project_loads: dict[str, asyncio.Task[Project | None]] = {}
 
     async def get_all_projects(self) -> list[Project]:
         """Get all projects in the repository.
@@ -62,48 +90,111 @@ class ProjectService:
         Note: This method doesn't require release_repo or file_repo.
         """
         # Try to get from cache first
-        if self.cache_repo:
-            cached = await self.cache_repo.get("all_projects")
-            if cached:
-                return [Project.parse_obj(p) for p in cached]
+        cached = await self._get_cached("all_projects", _PROJECTS_ADAPTER)
+        if cached is not None:
+            return cached
 
         # Fetch from database
         projects = await self.project_repo.get_all_projects()
 
         # Cache the result
         if self.cache_repo:
-            await self.cache_repo.set(
+            await self.cache_repo.set_bytes(
                 "all_projects",
-                [p.dict() for p in projects],
-                expire=60 * 5,  # Cache for 5 minutes
+                _PROJECTS_ADAPTER.dump_json(projects),
+                expire=jittered_ttl(60 * 5),  # Cache for about 5 minutes
             )
 
         return projects
 
+    def iter_project_names(self) -> AsyncIterator[str]:
+        """Stream the names of all projects straight from the database."""
+        return self.project_repo.iter_project_names()
+
+    def iter_project_versions(self) -> AsyncIterator[tuple[str, list[str]]]:
+        """Stream each project's name with its release versions, newest first."""
+        return self.project_repo.iter_project_versions()
+
     async def get_project_by_name(self, name: str) -> Project | None:
         """Get a project by name."""
         # Normalize the name for lookup
         normalized_name = normalize_name(name)
 
         # Try to get from cache first
-        if self.cache_repo:
-            cached = await self.cache_repo.get(f"project:{normalized_name}")
-            if cached:
-                return Project.parse_obj(cached)
-
-        # Fetch from database
-        project = await self.project_repo.get_project_by_name(name)
-
-        # Cache the result if found
-        if project and self.cache_repo:
-            await self.cache_repo.set(
-                f"project:{normalized_name}",
-                project.dict(),
-                expire=60 * 15,  # Cache for 15 minutes
+        hit, project = await self._get_cached_project(normalized_name)
+        if hit:
+            return project
+
+        # Concurrent misses for the same name wait on one database lookup.
+        # The shield keeps a cancelled caller from cancelling the others' load
+        load = self._project_loads.get(normalized_name)
+        if load is None:
+            load = asyncio.create_task(self._load_project(normalized_name))
+            self._project_loads[normalized_name] = load
+            load.add_done_callback(
+                lambda _: self._project_loads.pop(normalized_name, None)
             )
+        return await asyncio.shield(load)
+
+    async def _load_project(self, normalized_name: str) -> Project | None:
+        """Load a project from the database and cache the result."""
+        project = await self.project_repo.get_project_by_name(normalized_name)
+
+        # Cache the result, briefly remembering that it wasn't found
+        await self._cache_project(normalized_name, project)
 
         return project
 
+    async def get_projects_by_names(self, names: list[str]) -> dict[str, Project]:
+        """
+        Get several projects by name, keyed by the names as given.
+
+        All names are looked up in the cache in one round trip, the rest are
+        loaded with a single batched query, and those results are written
+        back in one more round trip. Names with no project are left out.
+        """
+        normalized = {name: normalize_name(name) for name in names}
+        unique_names = list(dict.fromkeys(normalized.values()))
+        found: dict[str, Project] = {}
+
+        # Look every name up in the cache in one round trip
+        missing: list[str] = []
+        if self.cache_repo:
+            keys = [f"project:{normalized_name}" for normalized_name in unique_names]
+            cached = await self.cache_repo.get_bytes_many(keys)
+            for normalized_name, key, raw in zip(
+                unique_names, keys, cached, strict=True
+            ):
+                hit, project = self._decode_cached_project(key, raw)
+                if not hit:
+                    missing.append(normalized_name)
+                elif project is not None:
+                    found[normalized_name] = project
+        else:
+            missing = unique_names
+
+        if missing:
+            projects = await self.project_repo.get_projects_by_names(missing)
+            found.update(projects)
+
+            # Cache the projects we had to load, and the names with none, in
+            # one round trip
+            if self.cache_repo:
+                await self.cache_repo.set_bytes_many(
+                    [
+                        self._project_cache_entry(
+                            normalized_name, projects.get(normalized_name)
+                        )
+                        for normalized_name in missing
+                    ]
+                )
+
+        return {
+            name: found[normalized_name]
+            for name, normalized_name in normalized.items()
+            if normalized_name in found
+        }
+
     async def create_project(self, project: Project) -> Project:
         """Create a new project."""
         # Ensure the normalized name is set
@@ -113,9 +204,10 @@ class ProjectService:
         # Create the project in the database
         result = await self.project_repo.create_project(project)
 
-        # Invalidate cache
+        # Invalidate cache, including any record of the name being unused
         if self.cache_repo:
             await self.cache_repo.delete("all_projects")
+            await self.cache_repo.delete(f"project:{project.normalized_name}")
 
         return result
 
@@ -134,8 +226,7 @@ class ProjectService:
     async def delete_project(self, project_id: int) -> bool:
         """Delete a project."""
         # Fetch the project first to get the normalized name for cache invalidation
-        projects = await self.project_repo.get_all_projects()
-        project = next((p for p in projects if p.id == project_id), None)
+        project = await self.project_repo.get_project_by_id(project_id)
 
         if not project:
             return False
@@ -152,57 +243,78 @@ class ProjectService:
 
     async def get_project_releases(self, project_name: str) -> list[Release]:
         """Get all releases for a project."""
-        # Get the project first
-        project = await self.get_project_by_name(project_name)
+        normalized_name = normalize_name(project_name)
+        releases_key = f"releases:{normalized_name}"
+
+        # Releases are keyed by name, so they can be fetched from the cache
+        # together with the project in a single round trip
+        entries = await self._get_project_and_cached(
+            normalized_name, releases_key, _RELEASES_ADAPTER
+        )
+        project, cached = entries
+        if cached:
+            return cached
+
+        if project is None:
+            project = await self.get_project_by_name(normalized_name)
         if not project or not project.id:
             return []
 
-        # Try to get from cache first
-        if self.cache_repo:
-            cached = await self.cache_repo.get(f"releases:{project.id}")
-            if cached:
-                return [Release.parse_obj(r) for r in cached]
-
         # Fetch from database
         releases = await self.release_repo.get_all_releases(project.id)
 
         # Cache the result
         if releases and self.cache_repo:
-            await self.cache_repo.set(
-                f"releases:{project.id}",
-                [r.dict() for r in releases],
-                expire=60 * 10,  # Cache for 10 minutes
+            await self.cache_repo.set_bytes(
+                releases_key,
+                _RELEASES_ADAPTER.dump_json(releases),
+                expire=jittered_ttl(60 * 10),  # Cache for about 10 minutes
             )
 
         return releases
 
+    async def iter_project_releases(self, project_name: str) -> AsyncIterator[Release]:
+        """Stream all releases for a project straight from the database."""
+        project = await self.get_project_by_name(project_name)
+        if not project or not project.id:
+            return
+
+        async for release in self.release_repo.iter_all_releases(project.id):
+            yield release
+
     async def get_release_files(self, project_name: str, version: str) -> list[File]:
         """Get all files for a specific release."""
-        # Get the project first
-        project = await self.get_project_by_name(project_name)
+        normalized_name = normalize_name(project_name)
+        files_key = f"files:{normalized_name}:{version}"
+
+        # Files are keyed by name and version, so a cache hit needs neither
+        # the project nor the release, and a miss still picks up the project
+        entries = await self._get_project_and_cached(
+            normalized_name, files_key, _FILES_ADAPTER
+        )
+        project, cached = entries
+        if cached:
+            return cached
+
+        if project is None:
+            project = await self.get_project_by_name(normalized_name)
         if not project or not project.id:
             return []
 
-        # Get the release
-        release = await self.release_repo.get_release(project.id, version)
-        if not release or not release.id:
+        # Fetch the release and its files from the database in one query
+        release_with_files = await self.release_repo.get_release_with_files(
+            project.id, version
+        )
+        if release_with_files is None:
             return []
-
-        # Try to get from cache first
-        if self.cache_repo:
-            cached = await self.cache_repo.get(f"files:{release.id}")
-            if cached:
-                return [File.parse_obj(f) for f in cached]
-
-        # Fetch from database
-        files = await self.file_repo.get_files_for_release(release.id)
+        _, files = release_with_files
 
         # Cache the result
         if files and self.cache_repo:
-            await self.cache_repo.set(
-                f"files:{release.id}",
-                [f.dict() for f in files],
-                expire=60 * 10,  # Cache for 10 minutes
+            await self.cache_repo.set_bytes(
+                files_key,
+                _FILES_ADAPTER.dump_json(files),
+                expire=jittered_ttl(60 * 10),  # Cache for about 10 minutes
             )
 
         return files
@@ -227,6 +339,95 @@ class ProjectService:
 
         # Invalidate cache
         if self.cache_repo:
-            await self.cache_repo.delete(f"releases:{project.id}")
+            await self.cache_repo.delete(f"releases:{project.normalized_name}")
 
         return result
+
+    async def _get_cached(self, key: str, adapter: TypeAdapter[T]) -> T | None:
+        """
+        Load a cached model or list of models, validating it from raw JSON.
+
+        Returns None if there is no cache, no entry, or the entry is invalid.
+        """
+        if not self.cache_repo:
+            return None
+
+        return self._validate_cached(key, await self.cache_repo.get_bytes(key), adapter)
+
+    async def _get_cached_project(
+        self, normalized_name: str
+    ) -> tuple[bool, Project | None]:
+        """
+        Look a project up in the cache.
+
+        Returns:
+            Whether the cache had an answer, and the project, which is None
+            if the cache records that no such project exists
+        """
+        if not self.cache_repo:
+            return False, None
+
+        key = f"project:{normalized_name}"
+        return self._decode_cached_project(key, await self.cache_repo.get_bytes(key))
+
+    @classmethod
+    def _decode_cached_project(
+        cls, key: str, cached: bytes | None
+    ) -> tuple[bool, Project | None]:
+        """Decode a raw project cache entry into (hit, project)."""
+        if cached == _PROJECT_MISS:
+            return True, None
+
+        project = cls._validate_cached(key, cached, _PROJECT_ADAPTER)
+        return project is not None, project
+
+    async def _cache_project(
+        self, normalized_name: str, project: Project | None
+    ) -> None:
+        """Cache a project, or the fact that there is none by this name."""
+        if not self.cache_repo:
+            return
+
+        key, value, expire = self._project_cache_entry(normalized_name, project)
+        await self.cache_repo.set_bytes(key, value, expire=expire)
+
+    @staticmethod
+    def _project_cache_entry(
+        normalized_name: str, project: Project | None
+    ) -> tuple[str, bytes, int | None]:
+        """Build the (key, value, expire) cache entry for a project lookup."""
+        key = f"project:{normalized_name}"
+        if project is None:
+            return key, _PROJECT_MISS, PROJECT_MISS_CACHE_TTL
+        # Cache for about 15 minutes
+        return key, project.model_dump_json().encode(), jittered_ttl(60 * 15)
+
+    async def _get_project_and_cached(
+        self, normalized_name: str, key: str, adapter: TypeAdapter[T]
+    ) -> tuple[Project | None, T | None]:
+        """Load a cached project and another cached entry in one round trip."""
+        if not self.cache_repo:
+            return None, None
+
+        project_key = f"project:{normalized_name}"
+        raw_project, raw = await self.cache_repo.get_bytes_many([project_key, key])
+        if raw_project == _PROJECT_MISS:
+            raw_project = None
+        return (
+            self._validate_cached(project_key, raw_project, _PROJECT_ADAPTER),
+            self._validate_cached(key, raw, adapter),
+        )
+
+    @staticmethod
+    def _validate_cached(
+        key: str, cached: bytes | None, adapter: TypeAdapter[T]
+    ) -> T | None:
+        """Validate a raw cache entry, or return None if missing or invalid."""
+        if cached is None:
+            return None
+
+        try:
+            return adapter.validate_json(cached)
+        except ValidationError as e:
+            logger.warning(f"Discarding invalid cache entry {key}: {e}")
+            return None
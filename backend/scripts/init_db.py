@@ -47,9 +47,14 @@ async def create_tables(conn: asyncpg.Connection) -> None:
         revoked BOOLEAN DEFAULT FALSE,
         revoked_at TIMESTAMP WITH TIME ZONE,
         description TEXT,
+        hash_version SMALLINT NOT NULL DEFAULT 1, -- 1: PBKDF2, 2: keyed BLAKE2b
         UNIQUE(key) -- For backward compatibility
     );
     """)
+    # Tables created before key hashes were versioned; existing rows are PBKDF2
+    await conn.execute(
+        "ALTER TABLE api_keys ADD COLUMN IF NOT EXISTS hash_version SMALLINT NOT NULL DEFAULT 1;"
+    )
 
     # Project-related tables
     await conn.execute("""
@@ -160,13 +165,17 @@ async def create_tables(conn: asyncpg.Connection) -> None:
     await conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);"
     )
-    await conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_users_provider ON users (provider_id, oauth_provider);"
-    )
+    # The UNIQUE (provider_id, oauth_provider) index serves provider lookups and
+    # is the arbiter for the user upsert, so a second copy only slows writes
+    await conn.execute("DROP INDEX IF EXISTS idx_users_provider;")
     await conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys (user_id);"
     )
     await conn.execute("CREATE INDEX IF NOT EXISTS idx_api_keys_key ON api_keys (key);")
+    # verify_api_key looks keys up by their public id, never by the raw key
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_keys_key_id ON api_keys (key_id);"
+    )
     await conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_project_permissions_user_id ON project_permissions (user_id);"
     )
@@ -176,6 +185,13 @@ async def create_tables(conn: asyncpg.Connection) -> None:
     await conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_projects_normalized_name ON projects (normalized_name);"
     )
+    # Trigram index over the same expression search_projects() matches with
+    # ILIKE '%term%', so substring search doesn't need a sequential scan
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_projects_search_trgm ON projects USING GIN "
+        "((normalized_name || ' ' || name || ' ' || coalesce(description, '')) gin_trgm_ops);"
+    )
     await conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_releases_project_id ON releases (project_id);"
     )
@@ -183,10 +199,21 @@ async def create_tables(conn: asyncpg.Connection) -> None:
     # await conn.execute(
     #     "CREATE INDEX IF NOT EXISTS idx_releases_uploaded_by ON releases (uploaded_by);"
     # )
+    # The UNIQUE (release_id, filename) index already serves release_id lookups
+    # in filename order, so a separate release_id index only slows down writes
+    await conn.execute("DROP INDEX IF EXISTS idx_files_release_id;")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);")
+    # jsonb_path_ops GIN indexes are far smaller than the default jsonb_ops and
+    # serve the @> containment lookups used for classifier/dependency search
     await conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_files_release_id ON files (release_id);"
+        "CREATE INDEX IF NOT EXISTS idx_files_classifiers ON files USING GIN (classifiers jsonb_path_ops);"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_releases_classifiers ON releases USING GIN (classifiers jsonb_path_ops);"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_releases_requires_dist ON releases USING GIN (requires_dist jsonb_path_ops);"
     )
-    await conn.execute("CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);")
     # Skip this index since the column uploaded_by might not exist in older schema versions
     # await conn.execute(
     #     "CREATE INDEX IF NOT EXISTS idx_files_uploaded_by ON files (uploaded_by);"
@@ -343,6 +370,40 @@ async def migrate_api_keys(conn: asyncpg.Connection) -> None:
         logging.exception("Error migrating API keys")
 
 
+async def migrate_json_columns(conn: asyncpg.Connection) -> None:
+    """Convert any metadata columns still declared as json to jsonb."""
+    try:
+        # Databases created before the columns were declared JSONB store them
+        # as json text, which the jsonb codec and GIN indexes can't use
+        rows = await conn.fetch(
+            """
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = ANY($1::text[])
+              AND data_type = 'json'
+            """,
+            ["users", "api_keys", "releases", "files"],
+        )
+
+        if not rows:
+            logging.info("No json columns need migration")
+            return
+
+        for row in rows:
+            table, column = row["table_name"], row["column_name"]
+            logging.info(f"Converting {table}.{column} from json to jsonb...")
+            await conn.execute(
+                f'ALTER TABLE "{table}" ALTER COLUMN "{column}" '
+                f'TYPE JSONB USING "{column}"::JSONB'
+            )
+
+        logging.info(f"Successfully migrated {len(rows)} json columns")
+
+    except Exception:
+        logging.exception("Error migrating json columns")
+
+
 async def main() -> None:
     """Initialize the database."""
     settings = get_settings()
@@ -362,6 +423,10 @@ async def main() -> None:
             database=settings.postgres.database,
         )
 
+        # Upgrade json columns first so the jsonb indexes below can be built
+        logger.info("Checking for json column migration...")
+        await migrate_json_columns(conn)
+
         # Create tables
         logger.info("Creating database tables...")
         await create_tables(conn)
@@ -10,11 +10,14 @@ This script tests all main functionality of the PyPI server:
 5. Authentication
 """
 
-import base64
+import asyncio
 import hashlib
+import io
 import logging
+import math
 import os
 import shutil
+import statistics
 import sys
 import tempfile
 import time
@@ -37,12 +40,86 @@ USERNAME = "testuser"
 PASSWORD = "testpassword"
 # The API expects an API key in the X-API-Key header, not in the Authorization header
 API_KEY_HEADER = {"X-API-Key": PASSWORD}
-# Old Basic Auth header (keep for reference)
-BASIC_AUTH_HEADER = {
-    "Authorization": f"Basic {base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()}"
-}
 PACKAGE_NAME = "sol-test-pkg"
 PACKAGE_VERSION = "0.1.0"
+# dist-info files of the test wheel, encoded once for the fixture version
+WHEEL_METADATA_TEMPLATE = """
+Metadata-Version: 2.1
+Name: {name}
+Version: {version}
+Summary: Test package for SOL PyPI index server
+Author: Test User
+Author-email: test@example.com
+Classifier: Programming Language :: Python :: 3
+Classifier: License :: OSI Approved :: MIT License
+Requires-Python: >=3.6
+"""
+WHEEL_METADATA = WHEEL_METADATA_TEMPLATE.format(
+    name=PACKAGE_NAME, version=PACKAGE_VERSION
+).encode()
+WHEEL_TAGS = b"""
+Wheel-Version: 1.0
+Generator: sol-test-script
+Root-Is-Purelib: true
+Tag: py3-none-any
+"""
+# Seconds to wait on each request to the server
+HTTP_TIMEOUT = 30.0
+# Seconds to wait for an upload to show up in the simple API, and between checks
+INDEX_WAIT_TIMEOUT = 5.0
+INDEX_POLL_INTERVAL = 0.05
+# Bytes per step when hashing the built or downloaded wheel
+WHEEL_HASH_CHUNK_SIZE = 1024 * 1024
+# The built wheel is kept here and reused by later runs; bump the suffix
+# whenever the wheel's contents change. Set SOL_TEST_CLEAN_FIXTURE to remove
+# it after the tests
+WHEEL_CACHE_DIR = os.path.join(tempfile.gettempdir(), "sol_test_fixture_v2")
+# Entries carry a fixed timestamp, so the wheel, and this digest, never change
+WHEEL_ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+WHEEL_SHA256 = "15203f51787ff799f46b88679ba7eb8a7fd42d7defe420c55b158f4c102bc099"
+# Number of wheels the throughput test uploads at once; it is skipped unless
+# SOL_TEST_UPLOAD_THROUGHPUT is set, since every run adds that many releases
+UPLOAD_THROUGHPUT_COUNT = int(os.environ.get("SOL_TEST_UPLOAD_THROUGHPUT", "0"))
+UPLOAD_THROUGHPUT_LIMITS = httpx.Limits(
+    max_connections=200, max_keepalive_connections=100
+)
+
+
+def wheel_entry(name: str) -> zipfile.ZipInfo:
+    """Describe a wheel member with a fixed timestamp and permissions."""
+    info = zipfile.ZipInfo(name, date_time=WHEEL_ENTRY_DATE_TIME)
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def write_wheel(target: str | io.BytesIO, version: str, metadata: bytes) -> None:
+    """Write a minimal test wheel for a version of the package."""
+    # Stored rather than deflated: the fixture is tiny and only uploaded
+    with zipfile.ZipFile(
+        target, "w", compression=zipfile.ZIP_STORED, allowZip64=False
+    ) as zf:
+        # Add the package module
+        zf.writestr(
+            wheel_entry("sol_test_pkg/__init__.py"),
+            'def hello():\n    return "Hello from sol_test_pkg!"',
+        )
+
+        # Add dist-info directory
+        zf.writestr(wheel_entry(f"sol_test_pkg-{version}.dist-info/METADATA"), metadata)
+        zf.writestr(wheel_entry(f"sol_test_pkg-{version}.dist-info/WHEEL"), WHEEL_TAGS)
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file without reading it into memory whole."""
+    with open(path, "rb", buffering=0) as f:
+        # Python 3.11+ hashes straight from the file in C, without the GIL
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: f.read(WHEEL_HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+        return sha256.hexdigest()
 
 
 class PyPITestCase(TestCase):
@@ -51,23 +128,28 @@ class PyPITestCase(TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test fixtures once for all test methods."""
+        # One client for the whole run, so requests reuse kept-alive connections
+        cls.client = httpx.Client(
+            base_url=BASE_URL, follow_redirects=True, timeout=HTTP_TIMEOUT
+        )
         cls.check_server()
-        cls.test_dir = tempfile.mkdtemp()
-        cls.pkg_dir = os.path.join(cls.test_dir, "sol_test_pkg")
+        cls.fetch_index_pages()
         cls.build_test_package()
 
     @classmethod
     def tearDownClass(cls):
         """Clean up after all tests."""
-        if hasattr(cls, "test_dir") and os.path.exists(cls.test_dir):
-            shutil.rmtree(cls.test_dir)
+        if hasattr(cls, "client"):
+            cls.client.close()
+        if os.environ.get("SOL_TEST_CLEAN_FIXTURE"):
+            shutil.rmtree(WHEEL_CACHE_DIR, ignore_errors=True)
 
     @classmethod
     def check_server(cls):
         """Check if the server is running."""
         try:
             logger.info(f"Checking server at {BASE_URL}/health")
-            response = httpx.get(f"{BASE_URL}/health", follow_redirects=True)
+            response = cls.client.get("/health")
             logger.info(f"Response status: {response.status_code}")
             logger.info(f"Response headers: {response.headers}")
 
@@ -82,96 +164,71 @@ class PyPITestCase(TestCase):
 
         logger.info("Server is running")
 
+    @classmethod
+    def fetch_index_pages(cls):
+        """Fetch the read-only pages that don't depend on an upload, concurrently."""
+        (
+            cls.health_response,
+            cls.simple_index_response,
+            cls.search_response,
+        ) = asyncio.run(cls._fetch_index_pages())
+
+    @staticmethod
+    async def _fetch_index_pages() -> list[httpx.Response]:
+        """Request the health, simple index and search pages at once."""
+        async with httpx.AsyncClient(
+            base_url=BASE_URL, follow_redirects=True, timeout=HTTP_TIMEOUT
+        ) as client:
+            return await asyncio.gather(
+                client.get("/health"),
+                client.get("/simple/"),
+                client.get("/search?q=test"),
+            )
+
     @classmethod
     def build_test_package(cls):
         """Build a test package."""
         logger.info("Creating test package...")
 
-        # Create package structure
-        os.makedirs(cls.pkg_dir, exist_ok=True)
-
-        # Create package files
-        with open(os.path.join(cls.pkg_dir, "__init__.py"), "w") as f:
-            f.write('def hello():\n    return "Hello from sol_test_pkg!"')
-
-        # Create setup.py
-        setup_py = os.path.join(cls.test_dir, "setup.py")
-        with open(setup_py, "w") as f:
-            f.write("""
-from setuptools import setup, find_packages
-
-setup(
-    name="sol-test-pkg",
-    version="0.1.0",
-    description="Test package for SOL PyPI index server",
-    author="Test User",
-    author_email="test@example.com",
-    packages=find_packages(),
-    classifiers=[
-        "Programming Language :: Python :: 3",
-        "License :: OSI Approved :: MIT License",
-    ],
-    python_requires=">=3.6",
-)
-""")
-
-        # Create a wheel file manually
-        wheel_dir = os.path.join(cls.test_dir, "dist")
-        os.makedirs(wheel_dir, exist_ok=True)
+        # Create a wheel file manually, unless an earlier run left one behind
+        os.makedirs(WHEEL_CACHE_DIR, exist_ok=True)
 
         # Create a simple wheel file
         cls.wheel_path = os.path.join(
-            wheel_dir,
+            WHEEL_CACHE_DIR,
             f"{PACKAGE_NAME.replace('-', '_')}-{PACKAGE_VERSION}-py3-none-any.whl",
         )
 
-        # Create zip file with minimal contents
-        with zipfile.ZipFile(cls.wheel_path, "w") as zf:
-            # Add the package module
-            zf.writestr(
-                "sol_test_pkg/__init__.py",
-                'def hello():\n    return "Hello from sol_test_pkg!"',
+        # The wheel is byte-for-byte reproducible, so its digest is known
+        # without reading it back
+        cls.wheel_sha256 = WHEEL_SHA256
+        if os.path.exists(cls.wheel_path):
+            logger.info(f"Reusing test package at {cls.wheel_path}")
+            logger.info(f"SHA256: {cls.wheel_sha256}")
+            return
+
+        # Create zip file with minimal contents, written under a temporary name
+        # and moved into place so a later run never sees a partial wheel
+        partial_path = f"{cls.wheel_path}.partial"
+        write_wheel(partial_path, PACKAGE_VERSION, WHEEL_METADATA)
+
+        # Check the recorded digest still matches what is built; set
+        # SOL_VERIFY_FIXTURE after changing the wheel's contents
+        if os.environ.get("SOL_VERIFY_FIXTURE"):
+            digest = file_sha256(partial_path)
+            assert digest == WHEEL_SHA256, (
+                f"Test wheel SHA256 {digest} != {WHEEL_SHA256}"
             )
 
-            # Add dist-info directory
-            zf.writestr(
-                f"sol_test_pkg-{PACKAGE_VERSION}.dist-info/METADATA",
-                f"""
-Metadata-Version: 2.1
-Name: {PACKAGE_NAME}
-Version: {PACKAGE_VERSION}
-Summary: Test package for SOL PyPI index server
-Author: Test User
-Author-email: test@example.com
-Classifier: Programming Language :: Python :: 3
-Classifier: License :: OSI Approved :: MIT License
-Requires-Python: >=3.6
-""",
-            )
-            zf.writestr(
-                f"sol_test_pkg-{PACKAGE_VERSION}.dist-info/WHEEL",
-                """
-Wheel-Version: 1.0
-Generator: sol-test-script
-Root-Is-Purelib: true
-Tag: py3-none-any
-""",
-            )
-
-        # Calculate hash for the wheel file
-        with open(cls.wheel_path, "rb") as f:
-            data = f.read()
-            cls.wheel_md5 = hashlib.md5(data).hexdigest()
-            cls.wheel_sha256 = hashlib.sha256(data).hexdigest()
+        os.replace(partial_path, cls.wheel_path)
 
         logger.info(f"Test package created at {cls.wheel_path}")
-        logger.info(f"MD5: {cls.wheel_md5}")
         logger.info(f"SHA256: {cls.wheel_sha256}")
 
     def test_01_health_check(self):
         """Test the health check endpoint."""
         logger.info("Testing health check endpoint...")
-        response = httpx.get(f"{BASE_URL}/health", follow_redirects=True)
+        response = self.health_response
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["status"], "healthy")
@@ -180,14 +237,14 @@ Tag: py3-none-any
     def test_02_simple_api_index(self):
         """Test the simple API index."""
         logger.info("Testing simple API index...")
-        response = httpx.get(f"{BASE_URL}/simple/", follow_redirects=True)
+        response = self.simple_index_response
         self.assertEqual(response.status_code, 200)
         logger.info("Simple API index test passed")
 
     def test_03_search_api(self):
         """Test the search API."""
         logger.info("Testing search API...")
-        response = httpx.get(f"{BASE_URL}/search?q=test", follow_redirects=True)
+        response = self.search_response
         self.assertEqual(response.status_code, 200)
         logger.info("Search API test passed")
 
@@ -196,13 +253,11 @@ Tag: py3-none-any
         logger.info("Testing authentication requirement...")
 
         # Try to access the upload endpoint without authentication
-        response = httpx.post(f"{BASE_URL}/legacy/", follow_redirects=True)
+        response = self.client.post("/legacy/")
         self.assertEqual(response.status_code, 401)
 
         # Try to access the upload endpoint with authentication but no data
-        response = httpx.post(
-            f"{BASE_URL}/legacy/", headers=API_KEY_HEADER, follow_redirects=True
-        )
+        response = self.client.post("/legacy/", headers=API_KEY_HEADER)
         # The API is returning 422 (Unprocessable Entity) because authentication worked
         # but the request is missing required form fields
         self.assertEqual(response.status_code, 422)
@@ -215,8 +270,8 @@ Tag: py3-none-any
 
         # Upload the package
         with open(self.wheel_path, "rb") as f:
-            response = httpx.post(
-                f"{BASE_URL}/legacy/",
+            response = self.client.post(
+                "/legacy/",
                 headers=API_KEY_HEADER,
                 files={"content": (os.path.basename(self.wheel_path), f)},
                 data={
@@ -228,7 +283,6 @@ Tag: py3-none-any
                     "author": "Test Author",
                     "author_email": "test@example.com",
                 },
-                follow_redirects=True,
             )
 
         # Check if upload was successful or got a duplicate key error (which is fine for testing)
@@ -238,15 +292,24 @@ Tag: py3-none-any
         )
         logger.info("Package upload test passed (or package already exists)")
 
-        # Wait a second for the server to process the upload
-        time.sleep(1)
+        # Wait for the server to list the upload, however long that takes here
+        self.wait_until_indexed(PACKAGE_NAME, PACKAGE_VERSION)
+
+    def wait_until_indexed(self, package: str, version: str) -> None:
+        """Poll the simple API until a release's files are listed, or fail."""
+        expected = f"{package.replace('-', '_')}-{version}"
+        deadline = time.monotonic() + INDEX_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            response = self.client.get(f"/simple/{package}/")
+            if response.status_code == 200 and expected in response.text:
+                return
+            time.sleep(INDEX_POLL_INTERVAL)
+        self.fail(f"{expected} was not indexed within {INDEX_WAIT_TIMEOUT}s")
 
     def test_06_simple_api_package(self):
         """Test the simple API for an uploaded package."""
         logger.info("Testing simple API for uploaded package...")
-        response = httpx.get(
-            f"{BASE_URL}/simple/{PACKAGE_NAME}/", follow_redirects=True
-        )
+        response = self.client.get(f"/simple/{PACKAGE_NAME}/")
         self.assertEqual(response.status_code, 200)
 
         # Check if our uploaded file appears in the simple API
@@ -258,9 +321,7 @@ Tag: py3-none-any
     def test_07_json_api_package(self):
         """Test the JSON API for an uploaded package."""
         logger.info("Testing JSON API for uploaded package...")
-        response = httpx.get(
-            f"{BASE_URL}/pypi/{PACKAGE_NAME}/json", follow_redirects=True
-        )
+        response = self.client.get(f"/pypi/{PACKAGE_NAME}/json")
         self.assertEqual(response.status_code, 200)
 
         data = response.json()
@@ -273,9 +334,7 @@ Tag: py3-none-any
         logger.info("Testing package download...")
 
         # First, get the file path from the JSON API
-        response = httpx.get(
-            f"{BASE_URL}/pypi/{PACKAGE_NAME}/json", follow_redirects=True
-        )
+        response = self.client.get(f"/pypi/{PACKAGE_NAME}/json")
         self.assertEqual(response.status_code, 200)
 
         data = response.json()
@@ -287,20 +346,89 @@ Tag: py3-none-any
         self.assertGreater(len(files), 0)
         file_url = files[0]["url"]
 
-        # Download the file
-        response = httpx.get(file_url, follow_redirects=True)
-        self.assertEqual(response.status_code, 200)
+        # Download the file, hashing it as it streams in rather than buffering it
+        sha256 = hashlib.sha256()
+        size = 0
+        with self.client.stream("GET", file_url) as response:
+            self.assertEqual(response.status_code, 200)
+            for chunk in response.iter_bytes(WHEEL_HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+                size += len(chunk)
 
         # Verify we have content (don't check the exact hash since test runs might have different package content)
-        downloaded_content = response.content
-        self.assertGreater(len(downloaded_content), 0)
+        self.assertGreater(size, 0)
 
-        # Calculate the hash for informational purposes
-        download_sha256 = hashlib.sha256(downloaded_content).hexdigest()
-        logger.info(f"Downloaded file SHA256: {download_sha256}")
+        # Report the hash for informational purposes
+        logger.info(f"Downloaded file SHA256: {sha256.hexdigest()}")
 
         logger.info("Package download test passed")
 
+    @unittest.skipUnless(
+        UPLOAD_THROUGHPUT_COUNT, "set SOL_TEST_UPLOAD_THROUGHPUT to run"
+    )
+    def test_99_upload_throughput(self):
+        """Test uploading many distinct wheels concurrently."""
+        logger.info(
+            f"Testing upload throughput with {UPLOAD_THROUGHPUT_COUNT} wheels..."
+        )
+
+        # Versions are unique to this run, so every upload creates a release
+        run_id = int(time.time())
+        versions = [f"0.2.{run_id}.{i}" for i in range(UPLOAD_THROUGHPUT_COUNT)]
+        wheels = {}
+        for version in versions:
+            buffer = io.BytesIO()
+            metadata = WHEEL_METADATA_TEMPLATE.format(
+                name=PACKAGE_NAME, version=version
+            ).encode()
+            write_wheel(buffer, version, metadata)
+            wheels[version] = buffer.getvalue()
+
+        started = time.perf_counter()
+        results = asyncio.run(self._upload_wheels(wheels))
+        elapsed = time.perf_counter() - started
+
+        statuses = [status for status, _ in results]
+        self.assertEqual(statuses, [200] * len(results))
+
+        # Report latency percentiles for informational purposes
+        latencies = sorted(latency for _, latency in results)
+        p95 = latencies[math.ceil(len(latencies) * 0.95) - 1]
+        logger.info(
+            f"Uploaded {len(results)} wheels in {elapsed:.2f}s: "
+            f"p50 {statistics.median(latencies) * 1000:.0f}ms, "
+            f"p95 {p95 * 1000:.0f}ms"
+        )
+
+        logger.info("Upload throughput test passed")
+
+    @staticmethod
+    async def _upload_wheels(wheels: dict[str, bytes]) -> list[tuple[int, float]]:
+        """Upload wheels at once, returning each status code and latency."""
+        async with httpx.AsyncClient(
+            base_url=BASE_URL,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT,
+            limits=UPLOAD_THROUGHPUT_LIMITS,
+        ) as client:
+
+            async def upload(version: str, content: bytes) -> tuple[int, float]:
+                filename = (
+                    f"{PACKAGE_NAME.replace('-', '_')}-{version}-py3-none-any.whl"
+                )
+                started = time.perf_counter()
+                response = await client.post(
+                    "/legacy/",
+                    headers=API_KEY_HEADER,
+                    files={"content": (filename, content)},
+                    data={"name": PACKAGE_NAME, "version": version},
+                )
+                return response.status_code, time.perf_counter() - started
+
+            return await asyncio.gather(
+                *(upload(version, content) for version, content in wheels.items())
+            )
+
 
 if __name__ == "__main__":
     print(f"Testing PyPI server at {BASE_URL}")
@@ -4,16 +4,23 @@ Test S3 connection script.
 """
 
 import asyncio
+import contextlib
 import logging
 import os
 
 import aiobotocore.session
-import boto3
+from aiobotocore.client import AioBaseClient
+from aiobotocore.config import AioConfig
 
-# Configure logging
+# Configure logging; SOL_TEST_LOG=DEBUG restores the botocore wire-level output
+LOG_LEVEL = getattr(logging, os.environ.get("SOL_TEST_LOG", "INFO").upper())
 logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=LOG_LEVEL, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+# Client libraries only report problems unless debug output was asked for
+if LOG_LEVEL > logging.DEBUG:
+    for noisy_logger in ("botocore", "aiobotocore", "urllib3", "s3transfer", "asyncio"):
+        logging.getLogger(noisy_logger).setLevel(logging.WARNING)
 
 logger = logging.getLogger("test_s3")
 
@@ -26,6 +33,52 @@ S3_DEFAULT_BUCKET = os.environ.get("S3_DEFAULT_BUCKET", "pypi")
 S3_USE_SSL = os.environ.get("S3_USE_SSL", "false").lower() == "true"
 S3_VERIFY = os.environ.get("S3_VERIFY", "false").lower() == "true"
 
+# The boto3 check covers the same botocore internals as the aiobotocore one,
+# so it only runs (and boto3 is only imported) when SOL_TEST_BOTO3_SYNC=1
+RUN_BOTO3_TEST = os.environ.get("SOL_TEST_BOTO3_SYNC") == "1"
+
+# Each test round-trips its own object, so the two can run at the same time
+BOTO3_TEST_KEY = "test-boto3.txt"
+# Objects the aiobotocore test uploads, reads back and deletes concurrently;
+# raise S3_TEST_CONCURRENCY to exercise the endpoint under parallel load
+S3_TEST_CONCURRENCY = int(os.environ.get("S3_TEST_CONCURRENCY", "1"))
+AIOBOTOCORE_TEST_KEYS = [
+    f"test-aiobotocore-{i}.txt" for i in range(S3_TEST_CONCURRENCY)
+]
+
+
+# aiobotocore client shared by every check in the run, so its connection pool
+# (and keep-alive connections) outlive any single check; see get_s3_client
+_s3_client_stack = contextlib.AsyncExitStack()
+_s3_client: AioBaseClient | None = None
+
+
+async def get_s3_client() -> AioBaseClient:
+    """Return the shared aiobotocore client, creating it on first use."""
+    global _s3_client
+    if _s3_client is None:
+        session = aiobotocore.session.AioSession()
+        _s3_client = await _s3_client_stack.enter_async_context(
+            session.create_client(
+                "s3",
+                region_name=S3_REGION_NAME,
+                endpoint_url=S3_ENDPOINT_URL,
+                aws_access_key_id=S3_ACCESS_KEY_ID,
+                aws_secret_access_key=S3_SECRET_ACCESS_KEY,
+                use_ssl=S3_USE_SSL,
+                verify=S3_VERIFY,
+                config=AioConfig(max_pool_connections=max(S3_TEST_CONCURRENCY, 10)),
+            )
+        )
+    return _s3_client
+
+
+async def close_s3_client() -> None:
+    """Close the shared aiobotocore client, if it was created."""
+    global _s3_client
+    await _s3_client_stack.aclose()
+    _s3_client = None
+
 
 async def test_aiobotocore():
     """Test S3 connection using aiobotocore (async)."""
@@ -34,64 +87,72 @@ async def test_aiobotocore():
         f"Settings: region={S3_REGION_NAME}, bucket={S3_DEFAULT_BUCKET}, use_ssl={S3_USE_SSL}, verify={S3_VERIFY}"
     )
 
-    session = aiobotocore.session.AioSession()
-
     try:
-        async with session.create_client(
-            "s3",
-            region_name=S3_REGION_NAME,
-            endpoint_url=S3_ENDPOINT_URL,
-            aws_access_key_id=S3_ACCESS_KEY_ID,
-            aws_secret_access_key=S3_SECRET_ACCESS_KEY,
-            use_ssl=S3_USE_SSL,
-            verify=S3_VERIFY,
-        ) as client:
-            # List buckets
-            logger.info("Listing buckets...")
-            resp = await client.list_buckets()
-            buckets = [bucket["Name"] for bucket in resp["Buckets"]]
-            logger.info(f"Found buckets: {buckets}")
-
-            # List objects in default bucket
-            if S3_DEFAULT_BUCKET in buckets:
-                logger.info(f"Listing objects in bucket {S3_DEFAULT_BUCKET}...")
-                resp = await client.list_objects_v2(Bucket=S3_DEFAULT_BUCKET)
-                if "Contents" in resp:
-                    objects = [obj["Key"] for obj in resp["Contents"]]
-                    logger.info(f"Found objects: {objects}")
-                else:
-                    logger.info("No objects found in bucket.")
-
-                # Try to upload a test file
-                logger.info("Uploading test file...")
-                await client.put_object(
-                    Bucket=S3_DEFAULT_BUCKET, Key="test.txt", Body=b"Hello, S3!"
+        client = await get_s3_client()
+
+        # List buckets
+        logger.info("Listing buckets...")
+        resp = await client.list_buckets()
+        buckets = [bucket["Name"] for bucket in resp["Buckets"]]
+        logger.info(f"Found buckets: {buckets}")
+
+        # List objects in default bucket
+        if S3_DEFAULT_BUCKET in buckets:
+            logger.info(f"Listing objects in bucket {S3_DEFAULT_BUCKET}...")
+            resp = await client.list_objects_v2(Bucket=S3_DEFAULT_BUCKET)
+            if "Contents" in resp:
+                objects = [obj["Key"] for obj in resp["Contents"]]
+                logger.info(f"Found objects: {objects}")
+            else:
+                logger.info("No objects found in bucket.")
+
+            # Try to upload the test files, all at once
+            logger.info(f"Uploading {len(AIOBOTOCORE_TEST_KEYS)} test file(s)...")
+            await asyncio.gather(
+                *(
+                    client.put_object(
+                        Bucket=S3_DEFAULT_BUCKET, Key=key, Body=b"Hello, S3!"
+                    )
+                    for key in AIOBOTOCORE_TEST_KEYS
                 )
-                logger.info("Upload successful!")
+            )
+            logger.info("Upload successful!")
 
-                # Download the test file
-                logger.info("Downloading test file...")
-                resp = await client.get_object(Bucket=S3_DEFAULT_BUCKET, Key="test.txt")
+            # Download the test files
+            async def download(key: str) -> bytes:
+                resp = await client.get_object(Bucket=S3_DEFAULT_BUCKET, Key=key)
                 async with resp["Body"] as stream:
-                    data = await stream.read()
-                logger.info(f"Downloaded content: {data.decode('utf-8')}")
+                    return await stream.read()
 
-                # Delete the test file
-                logger.info("Deleting test file...")
-                await client.delete_object(Bucket=S3_DEFAULT_BUCKET, Key="test.txt")
-                logger.info("Delete successful!")
-            else:
-                logger.warning(
-                    f"Bucket {S3_DEFAULT_BUCKET} not found, can't test object operations"
+            logger.info("Downloading test file(s)...")
+            contents = await asyncio.gather(
+                *(download(key) for key in AIOBOTOCORE_TEST_KEYS)
+            )
+            logger.info(f"Downloaded content: {contents[0].decode('utf-8')}")
+
+            # Delete the test files
+            logger.info("Deleting test file(s)...")
+            await asyncio.gather(
+                *(
+                    client.delete_object(Bucket=S3_DEFAULT_BUCKET, Key=key)
+                    for key in AIOBOTOCORE_TEST_KEYS
                 )
+            )
+            logger.info("Delete successful!")
+        else:
+            logger.warning(
+                f"Bucket {S3_DEFAULT_BUCKET} not found, can't test object operations"
+            )
 
-            logger.info("S3 aiobotocore test completed successfully!")
+        logger.info("S3 aiobotocore test completed successfully!")
     except Exception as e:
         logger.error(f"S3 aiobotocore test failed: {e!s}", exc_info=True)
 
 
 def test_boto3():
     """Test S3 connection using boto3 (sync)."""
+    import boto3
+
     logger.info(f"Testing boto3 S3 connection to {S3_ENDPOINT_URL}")
     logger.info(
         f"Settings: region={S3_REGION_NAME}, bucket={S3_DEFAULT_BUCKET}, use_ssl={S3_USE_SSL}, verify={S3_VERIFY}"
@@ -126,18 +187,20 @@ def test_boto3():
 
             # Try to upload a test file
             logger.info("Uploading test file...")
-            s3.put_object(Bucket=S3_DEFAULT_BUCKET, Key="test.txt", Body=b"Hello, S3!")
+            s3.put_object(
+                Bucket=S3_DEFAULT_BUCKET, Key=BOTO3_TEST_KEY, Body=b"Hello, S3!"
+            )
             logger.info("Upload successful!")
 
             # Download the test file
             logger.info("Downloading test file...")
-            resp = s3.get_object(Bucket=S3_DEFAULT_BUCKET, Key="test.txt")
+            resp = s3.get_object(Bucket=S3_DEFAULT_BUCKET, Key=BOTO3_TEST_KEY)
             data = resp["Body"].read()
             logger.info(f"Downloaded content: {data.decode('utf-8')}")
 
             # Delete the test file
             logger.info("Deleting test file...")
-            s3.delete_object(Bucket=S3_DEFAULT_BUCKET, Key="test.txt")
+            s3.delete_object(Bucket=S3_DEFAULT_BUCKET, Key=BOTO3_TEST_KEY)
             logger.info("Delete successful!")
         else:
             logger.warning(
@@ -149,11 +212,20 @@ def test_boto3():
         logger.error(f"S3 boto3 test failed: {e!s}", exc_info=True)
 
 
-if __name__ == "__main__":
-    # Run sync test
-    logger.info("=== Starting boto3 (sync) test ===")
-    test_boto3()
+async def main():
+    """Run the tests at once, the sync one (if enabled) on a worker thread."""
+    tests = [test_aiobotocore()]
+    if RUN_BOTO3_TEST:
+        logger.info("=== Starting boto3 (sync) and aiobotocore (async) tests ===")
+        tests.append(asyncio.to_thread(test_boto3))
+    else:
+        logger.info("=== Starting aiobotocore (async) test ===")
+
+    try:
+        await asyncio.gather(*tests)
+    finally:
+        await close_s3_client()
 
-    # Run async test
-    logger.info("\n=== Starting aiobotocore (async) test ===")
-    asyncio.run(test_aiobotocore())
+
+if __name__ == "__main__":
+    asyncio.run(main())